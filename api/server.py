@@ -0,0 +1,280 @@
+# transcript_clusterviz/api/server.py
+"""
+Local HTTP/JSON API for the parsing, clustering and density pipeline.
+
+Run from the project root with `python -m api.server --port 8765`. Every
+endpoint takes a JSON body with the path of an .srt file on this machine:
+
+    POST /parse    {"path": ...}
+    POST /cluster  {"path": ..., "gap_threshold": 5.0}
+    POST /density  {"path": ..., "bin_size": 60}
+    POST /summary  {"path": ..., "gap_threshold": 5.0}
+    POST /batch    {"requests": [{"op": "cluster", "path": ..., ...}, ...]}
+    GET  /health
+
+Tables are returned as columnar JSON ({"columns": [...], "data": {column: [...]}}),
+or as an Arrow IPC stream when the request sends
+`Accept: application/vnd.apache.arrow.stream` and pyarrow is installed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+from core.parse_srt import SRTParser
+from core.clustering import assign_time_clusters, word_density
+from controllers.parse_controller import ParseController
+from api.cache import ResultCache
+
+ARROW_MIME = "application/vnd.apache.arrow.stream"
+OPERATIONS = ("parse", "cluster", "density", "summary")
+
+
+class AnalysisService:
+    """
+    Runs pipeline requests on a bounded worker pool and caches the results by
+    file content hash and parameters. Has no Qt dependency.
+    """
+
+    def __init__(self, max_workers: int = 4, cache_size: int = 128,
+                 gap_threshold: float = 5.0, bin_size: int = 60):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.cache = ResultCache(cache_size)
+        self.gap_threshold = gap_threshold
+        self.bin_size = bin_size
+        self._hashes = {}
+        self._hash_lock = threading.Lock()
+
+    def file_hash(self, path: str) -> str:
+        """
+        SHA-256 of the file contents, memoized by (path, size, mtime).
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        with self._hash_lock:
+            if key in self._hashes:
+                return self._hashes[key]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        with self._hash_lock:
+            self._hashes[key] = digest.hexdigest()
+        return self._hashes[key]
+
+    def parse(self, path: str) -> pd.DataFrame:
+        return self.cache.get_or_compute(
+            (self.file_hash(path), "parse"),
+            lambda: SRTParser().parse_file(path))
+
+    # The core functions are used directly, without the controller's debug output
+    def cluster(self, path: str, gap_threshold: float) -> pd.DataFrame:
+        return self.cache.get_or_compute(
+            (self.file_hash(path), "cluster", gap_threshold),
+            lambda: assign_time_clusters(self.parse(path), gap_threshold))
+
+    def density(self, path: str, bin_size: int) -> pd.DataFrame:
+        return self.cache.get_or_compute(
+            (self.file_hash(path), "density", bin_size),
+            lambda: word_density(self.parse(path), bin_size))
+
+    def summary(self, path: str, gap_threshold: float) -> pd.DataFrame:
+        def compute():
+            controller = ParseController(gap_threshold=gap_threshold)
+            clustered = self.cluster(path, gap_threshold)
+            summary = controller.summarize_clusters(clustered)
+            keywords = controller.cluster_keywords(clustered)
+            return summary.merge(keywords, on="cluster_id", how="left")
+        return self.cache.get_or_compute(
+            (self.file_hash(path), "summary", gap_threshold), compute)
+
+    def run(self, request: dict) -> pd.DataFrame:
+        """
+        Runs one request {"op": ..., "path": ..., parameters} synchronously.
+        """
+        if not isinstance(request, dict):
+            raise ValueError("Each request must be a JSON object.")
+        op = request.get("op")
+        path = request.get("path")
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {op}")
+        if not path:
+            raise ValueError("Missing 'path'.")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"File not found: {path}")
+
+        if op == "parse":
+            return self.parse(path)
+        if op == "density":
+            bin_size = int(request.get("bin_size", self.bin_size))
+            if bin_size <= 0:
+                raise ValueError(f"'bin_size' must be a positive number of seconds, got {bin_size}.")
+            return self.density(path, bin_size)
+        gap_threshold = float(request.get("gap_threshold", self.gap_threshold))
+        if gap_threshold < 0:
+            raise ValueError(f"'gap_threshold' must be zero or more seconds, got {gap_threshold}.")
+        if op == "cluster":
+            return self.cluster(path, gap_threshold)
+        return self.summary(path, gap_threshold)
+
+    def submit(self, request: dict):
+        return self.executor.submit(self.run, request)
+
+    def run_batch(self, requests: list) -> list:
+        """
+        Runs requests concurrently on the pool; returns (result, error) pairs in order.
+        """
+        futures = [self.submit(request) for request in requests]
+        results = []
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def to_columnar(df: pd.DataFrame) -> dict:
+    """
+    Columnar JSON payload: {"columns": [...], "rows": n, "data": {column: [...]}}.
+    """
+    data = {}
+    for column in df.columns:
+        series = df[column]
+        if series.isna().any():
+            series = series.astype(object).where(series.notna(), None)
+        data[str(column)] = series.tolist()
+    return {"columns": [str(c) for c in df.columns], "rows": len(df), "data": data}
+
+
+def to_arrow(df: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def error_status(error: Exception) -> int:
+    if isinstance(error, FileNotFoundError):
+        return 404
+    if isinstance(error, (ValueError, KeyError, TypeError)):
+        return 400
+    return 500
+
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+    verbose = False  # log every request
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            cache = self.service.cache
+            self.send_json(200, {"status": "ok", "cached_results": len(cache),
+                                 "cache_hits": cache.hits, "cache_misses": cache.misses})
+        else:
+            self.send_json(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        endpoint = self.path.strip("/")
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError) as e:
+            self.send_json(400, {"error": f"Invalid JSON body: {e}"})
+            return
+        if not isinstance(body, dict):
+            self.send_json(400, {"error": "JSON body must be an object."})
+            return
+
+        if endpoint == "batch":
+            requests = body.get("requests")
+            if not isinstance(requests, list):
+                self.send_json(400, {"error": "'requests' must be a list."})
+                return
+            results = []
+            for result, error in self.service.run_batch(requests):
+                if error is not None:
+                    results.append({"error": str(error), "status": error_status(error)})
+                else:
+                    results.append(to_columnar(result))
+            self.send_json(200, {"results": results})
+            return
+
+        if endpoint not in OPERATIONS:
+            self.send_json(404, {"error": f"Unknown endpoint: /{endpoint}"})
+            return
+
+        try:
+            result = self.service.submit(dict(body, op=endpoint)).result()
+        except Exception as e:
+            self.send_json(error_status(e), {"error": str(e)})
+            return
+
+        if ARROW_MIME in self.headers.get("Accept", ""):
+            try:
+                self.send_bytes(200, to_arrow(result), ARROW_MIME)
+                return
+            except ImportError:
+                pass  # pyarrow not installed; fall back to JSON
+        self.send_json(200, to_columnar(result))
+
+    def send_json(self, status: int, payload: dict):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        self.send_bytes(status, body, "application/json")
+
+    def send_bytes(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            print(f"DEBUG: API {self.address_string()} - {format % args}")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765,
+                service: AnalysisService = None, verbose: bool = False) -> ThreadingHTTPServer:
+    handler = type("BoundAPIRequestHandler", (APIRequestHandler,),
+                   {"service": service or AnalysisService(), "verbose": verbose})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Transcript ClusterViz API server")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                            help="Maximum concurrent pipeline computations")
+    arg_parser.add_argument("--cache-size", type=int, default=128,
+                            help="Number of cached results")
+    arg_parser.add_argument("--verbose", action="store_true",
+                            help="Log every request")
+    args = arg_parser.parse_args()
+
+    service = AnalysisService(max_workers=args.workers, cache_size=args.cache_size)
+    server = make_server(args.host, args.port, service, verbose=args.verbose)
+    print(f"Serving Transcript ClusterViz API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
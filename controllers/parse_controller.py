@@ -1,13 +1,25 @@
 # transcript_clusterviz/controllers/parse_controller.py
 
+import numpy as np
 import pandas as pd
 from core.parse_srt import SRTParser
+from core.search_index import SubtitleSearchIndex
+from core.interval_index import IntervalIndex
+from core.srt_tail import SRTTailReader
+from core.clustering import assign_time_clusters, summarize_time_clusters, word_density
+from core.corpus import TranscriptCorpus
+from core.semantic import SemanticSubClusterer
+from core.keywords import ClusterKeywordExtractor
+from core.sparse_rows import SparseRows
+from core.session_store import write_session, read_session
 import plotly.express as px
 import plotly.io as pio
-import spacy as sp
 
 pio.templates.default = "plotly_dark"
 
+# Density bar hover text; customdata holds the keywords of clusters starting in the bin
+DENSITY_HOVER_TEMPLATE = "Time: %{x} min<br>Words: %{y}<br>%{customdata}<extra></extra>"
+
 
 class ParseController:
     def __init__(self, gap_threshold=5.0, bin_size=60):
@@ -19,47 +31,187 @@ class ParseController:
         self.gap_threshold = gap_threshold
         self.bin_size = bin_size
         self.current_df = None
+        self.search_index = None
+        self.interval_index = None
+        self.tail_reader = None
+        self._density_counts = None
+        self._density_bin_size = None
+        self.corpus = None
+        self.semantic_clusterer = None
+        self.keyword_extractor = None
+        self._cue_clusters = None
+        self._cue_clusters_df = None
 
     def parse_srt_file(self, filepath: str) -> pd.DataFrame:
         """
         Parse the SRT file into a DataFrame and store it internally.
+        Also builds the full-text search and time-interval indexes over the parsed cues.
         """
         self.current_df = self.parser.parse_file(filepath)
+        self.search_index = SubtitleSearchIndex.from_dataframe(self.current_df)
+        self.interval_index = IntervalIndex.from_dataframe(self.current_df)
+        self.keyword_extractor = None
         return self.current_df
 
+    def search(self, query: str) -> pd.DataFrame:
+        """
+        Runs a term, "phrase" or prefix* query against the search index.
+        Returns the matching cues; includes 'cluster_id' once clustering has run.
+        """
+        if self.search_index is None:
+            raise ValueError("No subtitle data available for search.")
+
+        hits = self.search_index.to_dataframe(self.search_index.search(query))
+        if self.current_df is not None and "cluster_id" in self.current_df.columns:
+            hits["cluster_id"] = self.cue_clusters()[hits["index"].to_numpy()]
+        return hits
+
+    def cue_clusters(self) -> np.ndarray:
+        """
+        Returns an array mapping subtitle 'index' to cluster_id (-1 if absent).
+        Rebuilt only when `current_df` is replaced, e.g., by re-clustering.
+        """
+        if self._cue_clusters_df is not self.current_df:
+            index = self.current_df["index"].to_numpy()
+            # The parser numbers subtitles sequentially, so the lookup is dense
+            lookup = np.full(int(index.max()) + 1 if len(index) else 0, -1, dtype=np.int64)
+            lookup[index] = self.current_df["cluster_id"].to_numpy()
+            self._cue_clusters = lookup
+            self._cue_clusters_df = self.current_df
+        return self._cue_clusters
+
     def cluster_by_time(self, df: pd.DataFrame = None) -> pd.DataFrame:
         """
         Perform time-based clustering on the DataFrame, assigning cluster IDs.
+        When clustering the stored data, the result replaces `current_df`.
         """
+        store_result = df is None
         if df is None:
             df = self.current_df
         if df is None or df.empty:
             raise ValueError("No subtitle data available for clustering.")
 
-        df = df.sort_values("start_seconds").reset_index(drop=True)
-        df["prev_end"] = df["end_seconds"].shift(1)
-        df["prev_end"].fillna(df["start_seconds"], inplace=True)
-        df["gap"] = df["start_seconds"] - df["prev_end"]
-
-        cluster_id = 0
-        cluster_ids = []
-        for i, row in df.iterrows():
-            if i == 0:
-                cluster_ids.append(cluster_id)
-                continue
-            if row["gap"] > self.gap_threshold:
-                cluster_id += 1
-            cluster_ids.append(cluster_id)
-
-        df["cluster_id"] = cluster_ids
-        df.drop(columns=["prev_end", "gap"], inplace=True)
+        df = assign_time_clusters(df, self.gap_threshold)
+        # Topic sub-clusters belong to the previous time clusters
+        df = df.drop(columns=["sub_cluster_id"], errors="ignore")
 
         print("DEBUG: Clustering completed. Cluster IDs assigned.")
         # Debug print
         print(df[["start_seconds", "end_seconds", "cluster_id"]].head())
 
+        if store_result:
+            self.current_df = df
+            self.interval_index = IntervalIndex.from_dataframe(df)
+
         return df
 
+    def semantic_sub_cluster(self, df: pd.DataFrame = None,
+                             similarity_threshold: float = None) -> pd.DataFrame:
+        """
+        Splits large time-based clusters by topic, adding a 'sub_cluster_id' column.
+        When run on the stored data, the result replaces `current_df`.
+        :param similarity_threshold: Split threshold (0-1); None splits at relatively deep dips
+        """
+        store_result = df is None
+        if df is None:
+            df = self.current_df
+        if df is None or "cluster_id" not in df.columns:
+            raise ValueError("No clustering data available. Run clustering first.")
+
+        # Created lazily: loading the spaCy model and vector cache is slow
+        if self.semantic_clusterer is None:
+            self.semantic_clusterer = SemanticSubClusterer()
+        self.semantic_clusterer.similarity_threshold = similarity_threshold
+
+        df = self.semantic_clusterer.sub_cluster(df)
+        if store_result:
+            self.current_df = df
+            self.interval_index = IntervalIndex.from_dataframe(df)
+        return df
+
+    def summarize_clusters(self, df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Builds per-cluster metadata from clustered subtitles.
+        Returns a DataFrame with columns ['cluster_id', 'start_seconds', 'end_seconds',
+        'duration', 'subtitle_count', 'word_count', 'text'].
+        """
+        if df is None:
+            df = self.current_df
+        if df is None or "cluster_id" not in df.columns:
+            raise ValueError("No clustering data available to summarize.")
+
+        summary = summarize_time_clusters(df)
+        summary["text"] = df.groupby("cluster_id")["text"].agg(" ".join).to_numpy()
+        return summary
+
+    def cluster_keywords(self, df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Returns the top keywords of every cluster as ['cluster_id', 'keywords'].
+        The keyword extractor is reused across calls, so after a gap threshold
+        change only the clusters that were split are recounted.
+        """
+        if df is None:
+            df = self.current_df
+        if df is None or "cluster_id" not in df.columns:
+            raise ValueError("No clustering data available. Run clustering first.")
+
+        if self.keyword_extractor is None or not self.keyword_extractor.covers(df):
+            self.keyword_extractor = ClusterKeywordExtractor().fit(df)
+        return self.keyword_extractor.extract(df)
+
+    def add_density_keywords(self, density_df: pd.DataFrame, keywords_df: pd.DataFrame,
+                             df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Adds a 'keywords' column to density_df with the keywords of the clusters
+        that start in each bin (used as chart hover text).
+        """
+        if df is None:
+            df = self.current_df
+        starts = df.groupby("cluster_id")["start_seconds"].min()
+        bins = (starts // self.bin_size).astype(int).rename("bin_index")
+        per_cluster = keywords_df.set_index("cluster_id")["keywords"]
+        per_cluster = per_cluster[per_cluster != ""]
+        by_bin = per_cluster.groupby(bins.reindex(per_cluster.index)).agg(
+            lambda k: "<br>".join(k.iloc[:3]))
+
+        density_df = density_df.copy()
+        density_df["keywords"] = density_df["bin_index"].map(by_bin).fillna("")
+        return density_df
+
+    def query_time_range(self, start: float, end: float) -> pd.DataFrame:
+        """
+        Returns the subtitles overlapping [start, end) seconds, ordered by start time.
+        Uses the interval index, so overlapping cues are included even when they
+        start before the window.
+        """
+        if self.interval_index is None:
+            raise ValueError("No subtitle data available for time-range queries.")
+        return self.current_df.loc[self.interval_index.query(start, end)]
+
+    def clusters_in_range(self, start: float, end: float) -> pd.DataFrame:
+        """
+        Returns the cluster summaries of clusters with subtitles overlapping [start, end).
+        """
+        cues = self.query_time_range(start, end)
+        if "cluster_id" not in cues.columns:
+            raise ValueError("No clustering data available. Run clustering first.")
+        cluster_ids = cues["cluster_id"].unique()
+        members = self.current_df[self.current_df["cluster_id"].isin(cluster_ids)]
+        return self.summarize_clusters(members)
+
+    def cluster_drilldown(self, cluster_id: int) -> pd.DataFrame:
+        """
+        Returns every subtitle overlapping the time span of the given cluster,
+        including overlapping cues assigned to neighbouring clusters.
+        """
+        if self.current_df is None or "cluster_id" not in self.current_df.columns:
+            raise ValueError("No clustering data available. Run clustering first.")
+        members = self.current_df[self.current_df["cluster_id"] == cluster_id]
+        if members.empty:
+            raise ValueError(f"Unknown cluster ID: {cluster_id}")
+        return self.query_time_range(
+            members["start_seconds"].min(), members["end_seconds"].max())
+
     def calculate_density(self, df: pd.DataFrame = None):
         """
         Groups subtitles by time bins (in seconds) and computes total word_count per bin.
@@ -76,11 +228,7 @@ class ParseController:
 
         # Binning logic: integer division of start_seconds by bin_size
         df["bin_index"] = (df["start_seconds"] // self.bin_size).astype(int)
-        grouped = df.groupby("bin_index")["word_count"].sum().reset_index()
-        grouped.rename(columns={"word_count": "words_per_bin"}, inplace=True)
-
-        # Add time in minutes for the x-axis in charts
-        grouped["time_minutes"] = grouped["bin_index"] * (self.bin_size / 60)
+        grouped = word_density(df, self.bin_size)
 
         # Debug print
         print(f"DEBUG: Density calculation result shape: {grouped.shape}")
@@ -90,9 +238,236 @@ class ParseController:
         return grouped
 
 
-    def plot_density_chart(self, density_df: pd.DataFrame):
+    def load_corpus(self, filepaths: list, memory_budget_mb: int = 1024) -> TranscriptCorpus:
+        """
+        Loads many .srt files in parallel into a TranscriptCorpus using the current
+        gap_threshold and bin_size. The single-file `current_df` is left untouched.
+        """
+        if self.corpus is not None:
+            self.corpus.close()
+        self.corpus = TranscriptCorpus(
+            gap_threshold=self.gap_threshold, bin_size=self.bin_size,
+            memory_budget_mb=memory_budget_mb)
+        self.corpus.load(filepaths)
+        return self.corpus
+
+    def save_session(self, path: str, settings: dict = None):
+        """
+        Writes the full analysis state to one binary session file: parsed and
+        clustered subtitles, cluster summary and keywords, density, the search
+        and keyword indexes and the gap/bin settings (plus any extra JSON-able
+        settings). Subtitle text is stored once, in the 'cues' frame.
+        """
+        if self.current_df is None:
+            raise ValueError("No subtitle data available to save.")
+
+        frames = {"cues": self.current_df}
+        if "cluster_id" in self.current_df.columns:
+            frames["summary"] = summarize_time_clusters(self.current_df)
+            frames["keywords"] = self.cluster_keywords()
+        frames["density"] = self.calculate_density()
+
+        self.search_index.compact()
+        arrays = {
+            "search/offsets": self.search_index.offsets,
+            "search/postings": self.search_index.postings,
+            "search/cue_ids": self.search_index.cue_ids,
+            "search/starts": self.search_index.starts,
+            "search/ends": self.search_index.ends,
+            # Row of each indexed cue in 'cues', so its text is not stored twice
+            "search/text_rows": pd.Index(self.current_df["index"]).get_indexer(
+                self.search_index.cue_ids),
+        }
+        string_arrays = {"search/vocabulary": self.search_index.vocabulary}
+        if "keywords" in frames:
+            counts = self.keyword_extractor.counts
+            arrays.update({
+                "keywords/cue_rows": self.keyword_extractor.cue_rows.to_numpy(),
+                "keywords/indptr": counts.indptr,
+                "keywords/indices": counts.indices,
+                "keywords/data": counts.data,
+            })
+            string_arrays["keywords/vocabulary"] = self.keyword_extractor.vocabulary
+        settings = dict(settings or {},
+                        gap_threshold=self.gap_threshold, bin_size=self.bin_size)
+        write_session(path, frames, arrays, string_arrays, settings)
+
+    def load_session(self, path: str):
+        """
+        Restores a session written by save_session without re-parsing, re-clustering
+        or re-indexing. Returns (frames, settings); frames has 'cues', 'density' and,
+        if the session was clustered, 'summary' and 'keywords'.
+        """
+        frames, arrays, string_arrays, settings = read_session(path)
+        self.stop_tail()
+        self.gap_threshold = settings["gap_threshold"]
+        self.bin_size = settings["bin_size"]
+        self.current_df = frames["cues"]
+
+        # np.asarray on the array skips the missing-value scan of Series.to_numpy
+        texts = np.asarray(self.current_df["text"].array)[arrays["search/text_rows"]]
+        self.search_index = SubtitleSearchIndex.from_arrays(
+            string_arrays["search/vocabulary"], arrays["search/offsets"],
+            arrays["search/postings"], arrays["search/cue_ids"],
+            arrays["search/starts"], arrays["search/ends"], texts)
+        self.interval_index = IntervalIndex.from_dataframe(self.current_df)
+
+        self.keyword_extractor = None
+        if "keywords/vocabulary" in string_arrays:
+            vocabulary = string_arrays["keywords/vocabulary"]
+            self.keyword_extractor = ClusterKeywordExtractor.from_counts(
+                vocabulary, arrays["keywords/cue_rows"],
+                SparseRows(arrays["keywords/indptr"], arrays["keywords/indices"],
+                           arrays["keywords/data"], len(vocabulary)))
+        return frames, settings
+
+    def start_tail(self, filepath: str) -> pd.DataFrame:
+        """
+        Starts live tail mode on an .srt file that is still being written.
+        Parses, clusters and bins what is there now; later appends are read
+        with poll_tail(). Returns the clustered DataFrame.
+        """
+        self.tail_reader = SRTTailReader(filepath, self.parser)
+        self.current_df = None
+        self.poll_tail()
+        return self.current_df
+
+    def stop_tail(self):
+        self.tail_reader = None
+
+    def poll_tail(self):
+        """
+        Parses only the cues appended since the last poll and folds them into the
+        current clustering, density and indexes. New cues extend the last open
+        cluster or start new ones, and only the density bins they fall in change.
+
+        Returns (new_rows, density_delta, full_refresh). density_delta has the
+        calculate_density columns for the changed bins. full_refresh is True when
+        the state was rebuilt instead (first poll, truncated file, or cues that
+        arrived out of order), in which case new_rows/density_delta are complete.
+        """
+        if self.tail_reader is None:
+            raise ValueError("Live tail mode is not active.")
+
+        full_refresh = False
+        if self.tail_reader.is_truncated():
+            self.tail_reader.reset()
+            self.current_df = None
+            full_refresh = True
+
+        new_df = self.tail_reader.read_new()
+        empty_delta = pd.DataFrame(
+            columns=["bin_index", "words_per_bin", "time_minutes"])
+        if new_df.empty and not full_refresh:
+            return new_df, empty_delta, False
+
+        new_df = new_df.sort_values("start_seconds", kind="mergesort")
+        if self.current_df is None or self.current_df.empty or \
+                "cluster_id" not in self.current_df.columns or \
+                new_df["start_seconds"].iloc[0] < self.current_df["start_seconds"].iloc[-1]:
+            frames = [df for df in (self.current_df, new_df)
+                      if df is not None and not df.empty]
+            if not frames:
+                return new_df, empty_delta, True
+            return self._rebuild_tail_state(pd.concat(frames, ignore_index=True))
+
+        # Continue clustering from the last cue; same gap rule as cluster_by_time
+        last = self.current_df.iloc[-1]
+        prev_end = new_df["end_seconds"].shift(1)
+        prev_end.iloc[0] = last["end_seconds"]
+        new_cluster = (new_df["start_seconds"] - prev_end) > self.gap_threshold
+        new_df["cluster_id"] = int(last["cluster_id"]) + new_cluster.cumsum()
+        new_df.index = pd.RangeIndex(
+            len(self.current_df), len(self.current_df) + len(new_df))
+
+        if self._density_bin_size == self.bin_size:
+            density_delta = self._add_density_counts(new_df)
+            if "bin_index" not in self.current_df.columns:
+                new_df = new_df.drop(columns="bin_index")
+            self.current_df = pd.concat([self.current_df, new_df])
+        else:
+            # Bin size changed since the last poll, so every bin is affected
+            self.current_df = pd.concat([self.current_df, new_df])
+            density_delta = self._reset_density_counts()
+            full_refresh = True
+
+        self.search_index.add_cues(new_df)
+        self.interval_index.append(
+            new_df["start_seconds"], new_df["end_seconds"], new_df.index)
+        return new_df, density_delta, full_refresh
+
+    def tail_keywords(self, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns ['cluster_id', 'keywords'] for the clusters that the rows from the
+        last poll_tail() extend or start. Only those clusters are rescored when
+        the keyword extractor is up to date with the previous poll.
+        """
+        if new_df.empty:
+            return pd.DataFrame(columns=["cluster_id", "keywords"])
+        extractor = self.keyword_extractor
+        if extractor is not None and extractor.has_totals and \
+                len(extractor.cue_rows) + len(new_df) == len(self.current_df):
+            return extractor.extract_appended(new_df)
+        keywords_df = self.cluster_keywords()
+        return keywords_df[keywords_df["cluster_id"].isin(new_df["cluster_id"])]
+
+    def tail_density_keywords(self, density_delta: pd.DataFrame,
+                              cluster_keywords: dict) -> pd.DataFrame:
+        """
+        add_density_keywords() for the bins of a poll_tail() density delta. Only the
+        subtitles from the first changed bin on are grouped, so the cost does not
+        grow with the transcript.
+        :param cluster_keywords: cluster_id -> keywords string
+        """
+        if density_delta.empty:
+            return density_delta.assign(keywords="")
+        first = density_delta["bin_index"].min() * self.bin_size
+        row = np.searchsorted(self.current_df["start_seconds"].to_numpy(), first, side="left")
+        tail = self.current_df.iloc[row:]
+        if row:
+            # Clusters that started before the first changed bin keep their start bin
+            tail = tail[tail["cluster_id"] > self.current_df["cluster_id"].iloc[row - 1]]
+        cluster_ids = tail["cluster_id"].unique()
+        keywords_df = pd.DataFrame({
+            "cluster_id": cluster_ids,
+            "keywords": [cluster_keywords.get(c, "") for c in cluster_ids]})
+        return self.add_density_keywords(density_delta, keywords_df, tail)
+
+    def _rebuild_tail_state(self, df: pd.DataFrame):
+        self.current_df = df
+        self.search_index = SubtitleSearchIndex.from_dataframe(df)
+        self.keyword_extractor = None
+        self.cluster_by_time()
+        return self.current_df, self._reset_density_counts(), True
+
+    def _reset_density_counts(self) -> pd.DataFrame:
+        """
+        Recomputes the running per-bin word totals used by live tail mode.
+        """
+        density_df = self.calculate_density()
+        self._density_counts = density_df.set_index("bin_index")["words_per_bin"]
+        self._density_bin_size = self.bin_size
+        return density_df
+
+    def _add_density_counts(self, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds the word counts of new_df to the running per-bin totals.
+        Returns only the changed bins, with the calculate_density columns.
+        """
+        new_df["bin_index"] = (new_df["start_seconds"] // self.bin_size).astype(int)
+        added = new_df.groupby("bin_index")["word_count"].sum()
+        self._density_counts = self._density_counts.add(
+            added, fill_value=0).astype(int)
+
+        delta = self._density_counts.loc[added.index].rename(
+            "words_per_bin").reset_index()
+        delta["time_minutes"] = delta["bin_index"] * (self.bin_size / 60)
+        return delta
+
+    def plot_density_chart(self, density_df: pd.DataFrame, highlight_bins=None):
         """
         Creates a Plotly figure for words-per-bin vs. time_bin, with cluster visualization.
+        :param highlight_bins: Optional iterable of bin_index values to highlight (e.g., search hits)
         """
         # Create figure with simpler configuration first
         fig = px.bar(
@@ -107,6 +482,18 @@ class ParseController:
             title='Word Density Over Time'
         )
 
+        # Show cluster keywords on hover
+        if "keywords" in density_df.columns:
+            fig.update_traces(
+                customdata=density_df["keywords"],
+                hovertemplate=DENSITY_HOVER_TEMPLATE)
+
+        # Highlight bins containing search hits
+        if highlight_bins is not None:
+            highlighted = density_df["bin_index"].isin(list(highlight_bins))
+            fig.update_traces(marker_color=[
+                '#ffa15a' if hit else '#636efa' for hit in highlighted])
+
         # Update layout
         fig.update_layout(
             template='plotly_dark',
@@ -135,6 +522,7 @@ class ParseController:
         return fig.to_html(
             full_html=False,
             include_plotlyjs='cdn',
+            div_id='density-chart',
             config={
                 'responsive': True,
                 'displayModeBar': False
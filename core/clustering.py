@@ -0,0 +1,64 @@
+# transcript_clusterviz/core/clustering.py
+
+import numpy as np
+import pandas as pd
+
+
+def assign_time_clusters(df: pd.DataFrame, gap_threshold: float, by: str = None) -> pd.DataFrame:
+    """
+    Sorts subtitles by start time and assigns a 'cluster_id' column in one
+    vectorized pass. A new cluster starts when the gap between a subtitle's
+    start and the previous subtitle's end exceeds gap_threshold.
+
+    :param by: Optional grouping column (e.g., 'source_id'); clustering runs
+               independently per group and cluster IDs restart at 0 in each.
+    """
+    keys = [by, "start_seconds"] if by else ["start_seconds"]
+    df = df.sort_values(keys, kind="mergesort").reset_index(drop=True)
+
+    starts = df["start_seconds"].to_numpy()
+    ends = df["end_seconds"].to_numpy()
+    new_cluster = np.zeros(len(df), dtype=bool)
+    new_cluster[1:] = (starts[1:] - ends[:-1]) > gap_threshold
+    cluster_ids = np.cumsum(new_cluster)
+
+    if by and len(df):
+        groups = df[by].to_numpy()
+        group_start = np.ones(len(df), dtype=bool)
+        group_start[1:] = groups[1:] != groups[:-1]
+        # Subtract the running count at each group's first row
+        first_row = np.maximum.accumulate(
+            np.where(group_start, np.arange(len(df)), 0))
+        cluster_ids = cluster_ids - cluster_ids[first_row]
+
+    df["cluster_id"] = cluster_ids.astype(np.int64)
+    return df
+
+
+def word_density(df: pd.DataFrame, bin_size: float) -> pd.DataFrame:
+    """
+    Total word_count per time bin of bin_size seconds, without modifying df.
+    Returns a DataFrame with columns ['bin_index', 'words_per_bin', 'time_minutes'].
+    """
+    bins = (df["start_seconds"] // bin_size).astype(int).rename("bin_index")
+    grouped = df["word_count"].groupby(bins).sum().rename("words_per_bin").reset_index()
+    grouped["time_minutes"] = grouped["bin_index"] * (bin_size / 60)
+    return grouped
+
+
+def summarize_time_clusters(df: pd.DataFrame, by: str = None) -> pd.DataFrame:
+    """
+    Aggregates clustered subtitles into one row per cluster with columns
+    [by,] 'cluster_id', 'start_seconds', 'end_seconds', 'duration',
+    'subtitle_count', 'word_count'.
+    """
+    keys = [by, "cluster_id"] if by else ["cluster_id"]
+    summary = df.groupby(keys, sort=True, observed=True).agg(
+        start_seconds=("start_seconds", "min"),
+        end_seconds=("end_seconds", "max"),
+        subtitle_count=("start_seconds", "size"),
+        word_count=("word_count", "sum"),
+    ).reset_index()
+    summary.insert(len(keys) + 2, "duration",
+                   summary["end_seconds"] - summary["start_seconds"])
+    return summary
@@ -0,0 +1,227 @@
+# transcript_clusterviz/core/corpus.py
+
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
+import pandas as pd
+from core.parse_srt import SRTParser
+from core.clustering import assign_time_clusters, summarize_time_clusters
+
+DEFAULT_DURATION_EDGES = [0, 5, 10, 30, 60, 120, 300, 600, np.inf]
+
+
+def _parse_transcript(filepath: str) -> pd.DataFrame:
+    # Module-level so it can be pickled into worker processes
+    return SRTParser().parse_file(filepath)
+
+
+def _compact(df: pd.DataFrame, source_id: int) -> pd.DataFrame:
+    """
+    Downcasts a parsed transcript to compact dtypes and tags it with its source ID.
+    """
+    return pd.DataFrame({
+        "source_id": np.full(len(df), source_id, dtype=np.int32),
+        "index": df["index"].to_numpy(dtype=np.int32),
+        "start_seconds": df["start_seconds"].to_numpy(dtype=np.float64),
+        "end_seconds": df["end_seconds"].to_numpy(dtype=np.float64),
+        "text": df["text"].astype("string"),
+        "word_count": df["word_count"].to_numpy(dtype=np.int32),
+    })
+
+
+class TranscriptCorpus:
+    """
+    Many transcripts held in one store, tagged by 'source_id'.
+
+    Transcripts are parsed in parallel worker processes, a bounded window at
+    a time, and handled in file order. Parsed data is kept in memory until
+    memory_budget_mb is reached; further transcripts are spilled to pickle files in spill_dir and streamed back in budget-sized
+    batches by the analytics methods. Clustering and density run per source
+    in one vectorized pass over each batch.
+    """
+
+    def __init__(self, gap_threshold=5.0, bin_size=60, memory_budget_mb=1024,
+                 spill_dir=None, max_workers=None):
+        """
+        :param gap_threshold: Float in seconds for time-based clustering
+        :param bin_size: Number of seconds per bin (e.g., 60s = 1 minute)
+        :param memory_budget_mb: In-memory limit for parsed subtitles before spilling to disk
+        :param spill_dir: Directory for spilled transcripts (a temp dir if None)
+        :param max_workers: Parser processes (defaults to the CPU count)
+        """
+        self.gap_threshold = gap_threshold
+        self.bin_size = bin_size
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.max_workers = max_workers
+        self._owns_spill_dir = spill_dir is None
+        self.spill_dir = spill_dir
+        self.sources = pd.DataFrame(
+            columns=["source_id", "filepath", "cue_count", "memory_bytes", "spilled"])
+        self._store = None
+        self._spilled = {}
+        self._memory_used = 0
+
+    def load(self, filepaths: list) -> pd.DataFrame:
+        """
+        Parses the .srt files in parallel and adds them to the store.
+        Returns the `sources` table.
+        """
+        first_id = len(self.sources)
+        frames, records = [], []
+        # Only a few parsed-but-unhandled transcripts are held at any time
+        window = 2 * (self.max_workers or os.cpu_count() or 1)
+        queued = enumerate(filepaths, start=first_id)
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            for source_id, path in islice(queued, window):
+                pending.append((source_id, executor.submit(_parse_transcript, path)))
+            while pending:
+                source_id, future = pending.popleft()
+                df = _compact(future.result(), source_id)
+                del future  # drop the uncompacted result
+                for next_id, path in islice(queued, 1):
+                    pending.append((next_id, executor.submit(_parse_transcript, path)))
+
+                size = int(df.memory_usage(deep=True).sum())
+                spilled = self._memory_used + size > self.memory_budget
+                if spilled:
+                    self._spill(source_id, df)
+                else:
+                    frames.append(df)
+                    self._memory_used += size
+                records.append({
+                    "source_id": source_id,
+                    "filepath": filepaths[source_id - first_id],
+                    "cue_count": len(df),
+                    "memory_bytes": size,
+                    "spilled": spilled,
+                })
+
+        if frames:
+            if self._store is not None:
+                frames.insert(0, self._store)
+            self._store = pd.concat(frames, ignore_index=True)
+        new_sources = pd.DataFrame(records)
+        self.sources = pd.concat(
+            [df for df in (self.sources, new_sources) if not df.empty],
+            ignore_index=True)
+        print(f"DEBUG: Corpus loaded {len(records)} transcripts "
+              f"({int(new_sources['spilled'].sum())} spilled to disk)")
+        return self.sources
+
+    def _spill(self, source_id: int, df: pd.DataFrame):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="clusterviz_corpus_")
+        path = os.path.join(self.spill_dir, f"source_{source_id}.pkl")
+        df.to_pickle(path)
+        self._spilled[source_id] = path
+
+    def iter_batches(self):
+        """
+        Yields DataFrames covering every source exactly once: the in-memory store,
+        then spilled sources reloaded in groups that fit within the memory budget.
+        """
+        if self._store is not None:
+            yield self._store
+
+        spilled = self.sources[self.sources["spilled"].astype(bool)]
+        batch, batch_bytes = [], 0
+        for source_id, size in zip(spilled["source_id"], spilled["memory_bytes"]):
+            if batch and batch_bytes + size > self.memory_budget:
+                yield pd.concat(batch, ignore_index=True)
+                batch, batch_bytes = [], 0
+            batch.append(pd.read_pickle(self._spilled[source_id]))
+            batch_bytes += size
+        if batch:
+            yield pd.concat(batch, ignore_index=True)
+
+    def cluster_summary(self) -> pd.DataFrame:
+        """
+        Clusters every source by time gap and returns one row per cluster with
+        columns ['source_id', 'cluster_id', 'start_seconds', 'end_seconds',
+        'duration', 'subtitle_count', 'word_count'].
+        """
+        summaries = [
+            summarize_time_clusters(
+                assign_time_clusters(batch, self.gap_threshold, by="source_id"),
+                by="source_id")
+            for batch in self.iter_batches()]
+        if not summaries:
+            raise ValueError("No transcripts loaded in the corpus.")
+        return pd.concat(summaries, ignore_index=True)
+
+    def calculate_density(self) -> pd.DataFrame:
+        """
+        Computes total word_count per time bin for every source.
+        Returns a DataFrame with columns ['source_id', 'bin_index', 'words_per_bin', 'time_minutes'].
+        """
+        densities = []
+        for batch in self.iter_batches():
+            bin_index = (batch["start_seconds"] // self.bin_size).astype(np.int64)
+            grouped = batch["word_count"].groupby(
+                [batch["source_id"], bin_index.rename("bin_index")]).sum()
+            densities.append(grouped.rename("words_per_bin").reset_index())
+        if not densities:
+            raise ValueError("No transcripts loaded in the corpus.")
+
+        density = pd.concat(densities, ignore_index=True)
+        density["time_minutes"] = density["bin_index"] * (self.bin_size / 60)
+        return density
+
+    def words_per_minute_by_time(self) -> pd.DataFrame:
+        """
+        Averages words per minute across transcripts for each time-of-stream bin.
+        A transcript counts towards a bin (with zero words if silent) up to its last bin.
+        Returns ['bin_index', 'time_minutes', 'avg_words_per_minute', 'source_count'].
+        """
+        density = self.calculate_density()
+
+        # Expand to a dense (source, bin) grid so silent bins count as zero
+        last_bins = density.groupby("source_id")["bin_index"].max()
+        lengths = last_bins.to_numpy() + 1
+        offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+        grid = pd.DataFrame({
+            "source_id": np.repeat(last_bins.index.to_numpy(), lengths),
+            "bin_index": np.arange(lengths.sum()) - offsets,
+        })
+        grid = grid.merge(density[["source_id", "bin_index", "words_per_bin"]],
+                          on=["source_id", "bin_index"], how="left")
+        grid["words_per_minute"] = grid["words_per_bin"].fillna(0) * (60 / self.bin_size)
+
+        result = grid.groupby("bin_index").agg(
+            avg_words_per_minute=("words_per_minute", "mean"),
+            source_count=("source_id", "size"),
+        ).reset_index()
+        result.insert(1, "time_minutes", result["bin_index"] * (self.bin_size / 60))
+        return result
+
+    def cluster_length_distribution(self, edges=None) -> pd.DataFrame:
+        """
+        Histogram of cluster durations (seconds) across all transcripts.
+        Returns ['duration_range', 'cluster_count', 'fraction'].
+        """
+        edges = DEFAULT_DURATION_EDGES if edges is None else edges
+        durations = self.cluster_summary()["duration"]
+        counts = pd.cut(durations, bins=edges, right=False).value_counts(sort=False)
+        return pd.DataFrame({
+            "duration_range": counts.index.astype(str),
+            "cluster_count": counts.to_numpy(),
+            "fraction": counts.to_numpy() / max(len(durations), 1),
+        })
+
+    def close(self):
+        """
+        Removes spilled transcripts from disk.
+        """
+        if self._owns_spill_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+        else:
+            for path in self._spilled.values():
+                if os.path.exists(path):
+                    os.remove(path)
+        self._spilled = {}
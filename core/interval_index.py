@@ -0,0 +1,146 @@
+# transcript_clusterviz/core/interval_index.py
+
+import numpy as np
+import pandas as pd
+
+# Cues longer than this (seconds) are kept out of the sorted arrays
+DEFAULT_LONG_CUE_SECONDS = 60.0
+
+
+class IntervalIndex:
+    """
+    A sorted-endpoint index over subtitle intervals for time-range queries.
+
+    Cues are sorted by start time, and a running maximum of end times is kept
+    alongside. Both arrays are monotonic, so a window query is two binary
+    searches followed by a scan of the candidate cues between them. Overlapping
+    cues are handled correctly since the test is on both endpoints, not just
+    the start.
+
+    Cues longer than long_cue_seconds are kept in a separate list that is
+    checked on every query. Otherwise one long cue would hold the running
+    maximum up for every cue after it. With the cap, the scan covers at most
+    the cues starting within long_cue_seconds before the window, so a query
+    is O(log n + k + L) for k results and L long cues.
+    """
+
+    def __init__(self, starts, ends, labels, long_cue_seconds: float = DEFAULT_LONG_CUE_SECONDS):
+        self.long_cue_seconds = long_cue_seconds
+        order = np.argsort(starts, kind="mergesort")
+        starts = np.asarray(starts, dtype=np.float64)[order]
+        ends = np.asarray(ends, dtype=np.float64)[order]
+        labels = np.asarray(labels)[order]
+        self._last_start = starts[-1] if len(starts) else -np.inf
+
+        long = ends - starts > long_cue_seconds
+        self._long_starts = starts[long]
+        self._long_ends = ends[long]
+        self._long_labels = labels[long]
+
+        self._starts = starts[~long]
+        self._ends = ends[~long]
+        self._labels = labels[~long]
+        self._max_ends = (np.maximum.accumulate(self._ends)
+                          if len(self._ends) else self._ends.copy())
+        self._size = len(self._starts)
+
+    def __len__(self):
+        return self._size + len(self._long_starts)
+
+    @property
+    def starts(self):
+        """
+        Start times of the cues up to long_cue_seconds long (as are ends, max_ends, labels).
+        """
+        return self._starts[:self._size]
+
+    @property
+    def ends(self):
+        return self._ends[:self._size]
+
+    @property
+    def max_ends(self):
+        return self._max_ends[:self._size]
+
+    @property
+    def labels(self):
+        return self._labels[:self._size]
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "IntervalIndex":
+        """
+        Indexes the ['start_seconds', 'end_seconds'] columns of df.
+        Query results are row labels of df (usable with df.loc).
+        """
+        return cls(df["start_seconds"].to_numpy(), df["end_seconds"].to_numpy(),
+                   df.index.to_numpy())
+
+    def append(self, starts, ends, labels):
+        """
+        Appends cues that start no earlier than the last indexed cue, in amortized
+        O(1) per cue (buffers grow by doubling). Raises ValueError otherwise.
+        """
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        labels = np.asarray(labels)
+        if len(starts) == 0:
+            return
+        if np.any(np.diff(starts) < 0) or starts[0] < self._last_start:
+            raise ValueError("Appended intervals must be sorted by start time.")
+        self._last_start = starts[-1]
+
+        long = ends - starts > self.long_cue_seconds
+        if long.any():
+            self._long_starts = np.concatenate((self._long_starts, starts[long]))
+            self._long_ends = np.concatenate((self._long_ends, ends[long]))
+            self._long_labels = np.concatenate((self._long_labels, labels[long]))
+            starts, ends, labels = starts[~long], ends[~long], labels[~long]
+        count = len(starts)
+        if count == 0:
+            return
+
+        needed = self._size + count
+        if needed > len(self._starts):
+            capacity = max(needed, 2 * len(self._starts), 16)
+            self._starts = self._grow(self._starts, capacity)
+            self._ends = self._grow(self._ends, capacity)
+            self._max_ends = self._grow(self._max_ends, capacity)
+            self._labels = self._grow(self._labels, capacity, labels.dtype)
+
+        new_max = np.maximum.accumulate(ends)
+        if self._size:
+            new_max = np.maximum(new_max, self._max_ends[self._size - 1])
+        window = slice(self._size, needed)
+        self._starts[window] = starts
+        self._ends[window] = ends
+        self._max_ends[window] = new_max
+        self._labels[window] = labels
+        self._size = needed
+
+    def _grow(self, array, capacity, dtype=None):
+        dtype = np.result_type(array.dtype, dtype) if dtype is not None else array.dtype
+        grown = np.empty(capacity, dtype=dtype)
+        grown[:self._size] = array[:self._size]
+        return grown
+
+    def query(self, start: float, end: float) -> np.ndarray:
+        """
+        Returns the labels, ordered by start time, of cues overlapping [start, end).
+        A cue [s, e) overlaps when s < end and e > start; with start == end this
+        is a point query for the cues active at that instant.
+        """
+        if end == start:
+            end = np.nextafter(end, np.inf)
+        # Everything before lo ends at or before `start`
+        lo = np.searchsorted(self.max_ends, start, side="right")
+        # Everything from hi onwards starts at or after `end`
+        hi = np.searchsorted(self.starts, end, side="left")
+        mask = self.ends[lo:hi] > start
+        labels = self.labels[lo:hi][mask]
+
+        long = (self._long_starts < end) & (self._long_ends > start)
+        if not long.any():
+            return labels
+        starts = np.concatenate((self.starts[lo:hi][mask], self._long_starts[long]))
+        labels = np.concatenate((labels, self._long_labels[long]))
+        return labels[np.argsort(starts, kind="mergesort")]
@@ -0,0 +1,255 @@
+# transcript_clusterviz/core/keywords.py
+
+import numpy as np
+import pandas as pd
+from core.search_index import tokenize
+from core.sparse_rows import SparseRows
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are aren't as at be because
+been before being below between both but by can can't cannot could couldn't did
+didn't do does doesn't doing don't down during each few for from further get got
+gonna had hadn't has hasn't have haven't having he he'd he'll he's her here here's
+hers herself him himself his how how's i i'd i'll i'm i've if in into is isn't it
+it's its itself just know let's like me more most mustn't my myself no nor not now
+of off oh okay on once only or other ought our ours ourselves out over own really
+right same shan't she she'd she'll she's should shouldn't so some such than that
+that's the their theirs them themselves then there there's these they they'd
+they'll they're they've think this those through to too um uh under until up very
+was wasn't we we'd we'll we're we've well were weren't what what's when when's
+where where's which while who who's whom why why's will with won't would wouldn't
+yeah yes you you'd you'll you're you've your yours yourself yourselves
+""".split())
+
+
+class ClusterKeywordExtractor:
+    """
+    Top keywords per cluster, scored with class-based TF-IDF (c-TF-IDF).
+
+    A sparse cue-by-term count matrix is built once per transcript. Cluster
+    term counts are sums of its rows, and scoring and top-k selection run on
+    all clusters at once. Term counts from the previous clustering are kept:
+    when the gap threshold changes, new clusters that are unions of old ones
+    are merged from the old cluster rows, and only split clusters are
+    recomputed from the cue rows. For cues appended in live tail mode,
+    extract_appended() rescores only the clusters they extend or start,
+    against running term totals.
+    """
+
+    def __init__(self, top_k: int = 5, stop_words=STOP_WORDS, min_length: int = 3):
+        self.top_k = top_k
+        self.stop_words = stop_words
+        self.min_length = min_length
+        self.vocabulary = []
+        self._term_ids = {}
+        self.cue_rows = pd.Index([])
+        self.counts = None
+        self._order = None
+        self._boundaries = None
+        self._cluster_counts = None
+        # Running totals over all clusters, for extract_appended()
+        self._term_totals = None
+        self._total_words = 0.0
+        self._cluster_total = 0
+        self._open_cluster = None  # (cluster_id, cols, counts) of the last cluster
+
+    def fit(self, df: pd.DataFrame) -> "ClusterKeywordExtractor":
+        """
+        Builds the cue-by-term count matrix from df ['index', 'text'].
+        """
+        self._term_ids = {}
+        self.counts = self._count_rows(df["text"])
+        self.vocabulary = np.array(list(self._term_ids), dtype=object)
+        self.cue_rows = pd.Index(df["index"].to_numpy())
+        self._order = None
+        return self
+
+    def add_cues(self, df: pd.DataFrame) -> "ClusterKeywordExtractor":
+        """
+        Appends the rows of new cues (e.g., from live tail mode) to the fitted matrix.
+        """
+        new = self._count_rows(df["text"])
+        self.counts = SparseRows(
+            np.concatenate((self.counts.indptr, self.counts.indptr[-1] + new.indptr[1:])),
+            np.concatenate((self.counts.indices, new.indices)),
+            np.concatenate((self.counts.data, new.data)), len(self._term_ids))
+        self.vocabulary = np.array(list(self._term_ids), dtype=object)
+        self.cue_rows = self.cue_rows.append(pd.Index(df["index"].to_numpy()))
+        self._order = None
+        return self
+
+    @classmethod
+    def from_counts(cls, vocabulary, cue_rows, counts: SparseRows, **kwargs) -> "ClusterKeywordExtractor":
+        """
+        Restores a fitted extractor from its count matrix (e.g., from a saved session).
+        """
+        extractor = cls(**kwargs)
+        extractor.vocabulary = np.array(list(vocabulary), dtype=object)
+        extractor._term_ids = dict(zip(extractor.vocabulary, range(len(vocabulary))))
+        extractor.cue_rows = pd.Index(cue_rows)
+        extractor.counts = counts
+        return extractor
+
+    def _count_rows(self, texts) -> SparseRows:
+        # Term IDs are collected for all texts first, then counted in one pass
+        term_ids = self._term_ids
+        ids, lengths = [], []
+        for text in texts:
+            row = [term_ids.setdefault(t, len(term_ids)) for t in tokenize(text)
+                   if len(t) >= self.min_length and t not in self.stop_words
+                   and not t.isdigit()]
+            ids.extend(row)
+            lengths.append(len(row))
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        return SparseRows.from_coo(rows, ids, np.ones(len(ids)), len(lengths), len(term_ids))
+
+    @property
+    def has_totals(self) -> bool:
+        """
+        True once extract() has run, so extract_appended() can be used.
+        """
+        return self._term_totals is not None
+
+    def covers(self, df: pd.DataFrame) -> bool:
+        """
+        True if every cue in df is in the fitted matrix.
+        """
+        return len(df) == len(self.cue_rows) and \
+            not (self.cue_rows.get_indexer(df["index"]) < 0).any()
+
+    def cluster_term_counts(self, df: pd.DataFrame):
+        """
+        Returns (cluster_ids, SparseRows of term counts per cluster) for a
+        DataFrame ordered as produced by time-based clustering.
+        """
+        order = self.cue_rows.get_indexer(df["index"])
+        if (order < 0).any():
+            raise ValueError("Subtitles missing from the keyword index. Call fit() first.")
+        cluster_ids = df["cluster_id"].to_numpy()
+        change = np.ones(len(df), dtype=bool)
+        change[1:] = cluster_ids[1:] != cluster_ids[:-1]
+        boundaries = np.flatnonzero(change)
+        n = len(df)
+
+        if self._order is not None and np.array_equal(order, self._order):
+            counts = self._update_counts(order, boundaries, n)
+        else:
+            counts = self._counts_from_cues(order, boundaries, n)
+
+        self._order = order
+        self._boundaries = boundaries
+        self._cluster_counts = counts
+        return cluster_ids[boundaries], counts
+
+    def _counts_from_cues(self, order, boundaries, n, clusters=None) -> SparseRows:
+        """
+        Sums cue rows into clusters. If clusters is given, only those new cluster
+        numbers are computed (others are left empty).
+        """
+        group = np.repeat(np.arange(len(boundaries)), np.diff(np.append(boundaries, n)))
+        if clusters is not None:
+            keep = np.isin(group, clusters)
+            positions, cols, vals = self.counts.gather(order[keep])
+            return SparseRows.from_coo(group[keep][positions], cols, vals,
+                                       len(boundaries), self.counts.n_cols)
+        positions, cols, vals = self.counts.gather(order)
+        return SparseRows.from_coo(group[positions], cols, vals,
+                                   len(boundaries), self.counts.n_cols)
+
+    def _update_counts(self, order, boundaries, n) -> SparseRows:
+        old = self._boundaries
+        new_ends = np.append(boundaries[1:], n)
+
+        # A new cluster is a union of old ones if both its edges are old edges
+        old_edges = np.append(old, n)
+        reusable = np.isin(boundaries, old_edges) & np.isin(new_ends, old_edges)
+
+        # Old cluster k lands in the new cluster containing its first row
+        target = np.searchsorted(boundaries, old, side="right") - 1
+        merged = reusable[target]
+        old_rows = self._cluster_counts.row_ids()
+        take = merged[old_rows]
+        reused = (target[old_rows[take]], self._cluster_counts.indices[take],
+                  self._cluster_counts.data[take])
+
+        split = np.flatnonzero(~reusable)
+        fresh = self._counts_from_cues(order, boundaries, n, clusters=split)
+        print(f"DEBUG: Keywords reused {int(reusable.sum())} clusters, "
+              f"recomputed {len(split)} from subtitles")
+        return SparseRows.from_coo(
+            np.concatenate((reused[0], fresh.row_ids())),
+            np.concatenate((reused[1], fresh.indices)),
+            np.concatenate((reused[2], fresh.data)),
+            len(boundaries), self.counts.n_cols)
+
+    def extract(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Scores terms per cluster with c-TF-IDF and returns the top_k per cluster.
+        Returns a DataFrame with columns ['cluster_id', 'keywords'] where keywords
+        is a comma-separated string, best first.
+        """
+        cluster_ids, counts = self.cluster_term_counts(df)
+        self._term_totals = np.bincount(counts.indices, weights=counts.data,
+                                        minlength=counts.n_cols)
+        self._total_words = float(counts.data.sum())
+        self._cluster_total = len(cluster_ids)
+        self._keep_open_cluster(cluster_ids, counts)
+        return self._score(cluster_ids, counts)
+
+    def extract_appended(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds cues appended after the last extract() call, e.g., by live tail mode,
+        and returns keywords for only the clusters they extend or start. df holds
+        just the new cues, in order, with cluster IDs continuing the previous ones.
+        The cost depends on the new cues and the last open cluster, not on the
+        transcript size. Other clusters are not rescored against the new totals.
+        """
+        if self._term_totals is None:
+            raise ValueError("No keywords extracted yet. Call extract() first.")
+        first_row = self.counts.n_rows
+        self.add_cues(df)
+        touched, group = np.unique(df["cluster_id"].to_numpy(), return_inverse=True)
+        positions, cols, vals = self.counts.gather(np.arange(first_row, self.counts.n_rows))
+        rows = group[positions]
+
+        n_cols = self.counts.n_cols
+        self._term_totals = np.concatenate((
+            self._term_totals, np.zeros(n_cols - len(self._term_totals))))
+        self._term_totals += np.bincount(cols, weights=vals, minlength=n_cols)
+        self._total_words += float(vals.sum())
+        self._cluster_total += len(touched)
+
+        # The first new cue may extend the last cluster of the previous call
+        if self._open_cluster is not None and self._open_cluster[0] == touched[0]:
+            _, open_cols, open_vals = self._open_cluster
+            rows = np.concatenate((rows, np.zeros(len(open_cols), dtype=np.int64)))
+            cols = np.concatenate((cols, open_cols))
+            vals = np.concatenate((vals, open_vals))
+            self._cluster_total -= 1
+        counts = SparseRows.from_coo(rows, cols, vals, len(touched), n_cols)
+        self._keep_open_cluster(touched, counts)
+        return self._score(touched, counts)
+
+    def _keep_open_cluster(self, cluster_ids, counts: SparseRows):
+        if not len(cluster_ids):
+            self._open_cluster = None
+            return
+        begin = counts.indptr[-2]
+        self._open_cluster = (cluster_ids[-1], counts.indices[begin:], counts.data[begin:])
+
+    def _score(self, cluster_ids, counts: SparseRows) -> pd.DataFrame:
+        # c-TF-IDF: term frequency within the cluster, weighted by
+        # log(1 + average words per cluster / term frequency across all clusters)
+        cluster_words = counts.row_sums()
+        term_totals = self._term_totals
+        average_words = self._total_words / self._cluster_total if self._cluster_total else 0
+        idf = np.log1p(average_words / np.where(term_totals > 0, term_totals, 1))
+        tf = counts.scale_rows(1 / np.where(cluster_words > 0, cluster_words, 1))
+        scores = tf.scale_columns(idf)
+
+        rows, cols, _ = scores.top_k(self.top_k)
+        terms = pd.Series(self.vocabulary[cols]).groupby(rows).agg(", ".join)
+        return pd.DataFrame({
+            "cluster_id": cluster_ids,
+            "keywords": terms.reindex(np.arange(len(cluster_ids)), fill_value="").to_numpy(),
+        })
@@ -27,10 +27,17 @@ class SRTParser:
         with open(filepath, 'r', encoding='utf-8') as f:
             srt_data = f.read()
 
+        return self.parse_string(srt_data)
+
+    def parse_string(self, srt_data: str, start_index: int = 1) -> pd.DataFrame:
+        """
+        Parses .srt content into a DataFrame with the same columns as parse_file.
+        :param start_index: Value of 'index' for the first subtitle (for appended chunks)
+        """
         subtitles = list(srt.parse(srt_data))
         records = []
 
-        for idx, sub in enumerate(subtitles, start=1):
+        for idx, sub in enumerate(subtitles, start=start_index):
             cleaned_text = self.clean_subtitle_text(sub.content)
             word_count = len(cleaned_text.split()) if cleaned_text else 0
 
@@ -42,5 +49,6 @@ class SRTParser:
                 "word_count": word_count
             })
 
-        df = pd.DataFrame(records)
+        df = pd.DataFrame(records, columns=[
+            "index", "start_seconds", "end_seconds", "text", "word_count"])
         return df
@@ -0,0 +1,232 @@
+# transcript_clusterviz/core/search_index.py
+
+import re
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercases text and splits it into word tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class SubtitleSearchIndex:
+    """
+    An in-memory inverted index over subtitle text.
+
+    Each token maps to a sorted postings list of cue positions. The postings
+    are kept in one flat array (``postings``) sliced by ``offsets`` over a
+    sorted ``vocabulary``, so a prefix query is a single contiguous slice.
+    Per-cue ``cue_ids``, ``starts`` and ``ends`` carry the SRT index and
+    timestamps of every posting.
+
+    Cues appended with add_cues() go into a small delta index that is merged
+    into the flat arrays once it grows as large as the base (amortized O(1)
+    per appended cue).
+    """
+
+    def __init__(self):
+        self.vocabulary = []
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int64)
+        self.cue_ids = np.zeros(0, dtype=np.int64)
+        self.starts = np.zeros(0, dtype=np.float64)
+        self.ends = np.zeros(0, dtype=np.float64)
+        self.texts = []
+        self._delta_postings = {}
+        self._delta_cues = []  # (cue_id, start, end) of appended cues
+
+    def __len__(self):
+        return len(self.cue_ids) + len(self._delta_cues)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "SubtitleSearchIndex":
+        """
+        Builds the index from a parsed subtitle DataFrame with columns
+        ['index', 'start_seconds', 'end_seconds', 'text'].
+        """
+        index = cls()
+        index.cue_ids = df["index"].to_numpy(dtype=np.int64)
+        index.starts = df["start_seconds"].to_numpy(dtype=np.float64)
+        index.ends = df["end_seconds"].to_numpy(dtype=np.float64)
+        index.texts = df["text"].tolist()
+
+        postings = {}
+        for position, text in enumerate(index.texts):
+            for token in set(tokenize(text)):
+                postings.setdefault(token, []).append(position)
+        index._set_postings(postings)
+        return index
+
+    @classmethod
+    def from_arrays(cls, vocabulary, offsets, postings, cue_ids, starts, ends,
+                    texts) -> "SubtitleSearchIndex":
+        """
+        Restores an index from the arrays of a compacted index (e.g., a saved session).
+        """
+        index = cls()
+        index.vocabulary = list(vocabulary)
+        index.offsets = offsets
+        index.postings = postings
+        index.cue_ids = cue_ids
+        index.starts = starts
+        index.ends = ends
+        index.texts = list(texts)
+        return index
+
+    def _set_postings(self, postings: dict):
+        self.vocabulary = sorted(postings)
+        lengths = np.fromiter(
+            (len(postings[t]) for t in self.vocabulary),
+            dtype=np.int64, count=len(self.vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)))
+        self.postings = np.fromiter(
+            (p for t in self.vocabulary for p in postings[t]),
+            dtype=np.int64, count=int(self.offsets[-1]))
+
+    def add_cues(self, df: pd.DataFrame):
+        """
+        Appends newly parsed cues to the index without rebuilding it.
+        """
+        position = len(self)
+        for cue_id, start, end, text in zip(df["index"], df["start_seconds"],
+                                            df["end_seconds"], df["text"]):
+            self._delta_cues.append((cue_id, start, end))
+            self.texts.append(text)
+            for token in set(tokenize(text)):
+                self._delta_postings.setdefault(token, []).append(position)
+            position += 1
+
+        if len(self._delta_cues) >= max(1024, len(self.cue_ids)):
+            self.compact()
+
+    def compact(self):
+        """
+        Merges the delta index of appended cues into the flat postings arrays.
+        """
+        if not self._delta_cues:
+            return
+        postings = {
+            t: self._slice(i, i + 1).tolist() for i, t in enumerate(self.vocabulary)}
+        for token, positions in self._delta_postings.items():
+            postings.setdefault(token, []).extend(positions)
+        self._set_postings(postings)
+
+        delta = np.asarray(self._delta_cues, dtype=np.float64)
+        self.cue_ids = np.concatenate((self.cue_ids, delta[:, 0].astype(np.int64)))
+        self.starts = np.concatenate((self.starts, delta[:, 1]))
+        self.ends = np.concatenate((self.ends, delta[:, 2]))
+        self._delta_postings = {}
+        self._delta_cues = []
+
+    def _slice(self, lo: int, hi: int) -> np.ndarray:
+        return self.postings[self.offsets[lo]:self.offsets[hi]]
+
+    def _with_delta(self, base: np.ndarray, tokens) -> np.ndarray:
+        # Delta positions are all greater than base positions, so appending keeps order
+        extra = [p for t in tokens for p in self._delta_postings.get(t, ())]
+        if not extra:
+            return base
+        if len(tokens) > 1:
+            extra = sorted(set(extra))
+        return np.concatenate((base, np.asarray(extra, dtype=np.int64)))
+
+    def term(self, token: str) -> np.ndarray:
+        """
+        Returns the sorted cue positions containing the exact token.
+        """
+        token = token.lower()
+        i = bisect_left(self.vocabulary, token)
+        if i < len(self.vocabulary) and self.vocabulary[i] == token:
+            base = self._slice(i, i + 1)
+        else:
+            base = np.zeros(0, dtype=np.int64)
+        return self._with_delta(base, [token])
+
+    def prefix(self, prefix: str) -> np.ndarray:
+        """
+        Returns the sorted cue positions containing any token starting with prefix.
+        """
+        prefix = prefix.lower()
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + "\uffff", lo)
+        if lo == hi:
+            base = np.zeros(0, dtype=np.int64)
+        elif hi - lo == 1:
+            base = self._slice(lo, hi)
+        else:
+            base = np.unique(self._slice(lo, hi))
+        delta_tokens = [t for t in self._delta_postings if t.startswith(prefix)]
+        return self._with_delta(base, delta_tokens)
+
+    def phrase(self, phrase: str) -> np.ndarray:
+        """
+        Returns the sorted cue positions containing the tokens of phrase in order.
+        """
+        tokens = tokenize(phrase)
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+        candidates = self._intersect([self.term(t) for t in tokens])
+        if len(tokens) == 1:
+            return candidates
+
+        # Verify word order only on the (small) intersection of postings
+        n = len(tokens)
+        matches = []
+        for position in candidates:
+            cue_tokens = tokenize(self.texts[position])
+            if any(cue_tokens[i:i + n] == tokens
+                   for i in range(len(cue_tokens) - n + 1)):
+                matches.append(position)
+        return np.asarray(matches, dtype=np.int64)
+
+    def search(self, query: str) -> np.ndarray:
+        """
+        Runs a query and returns the sorted cue positions matching every clause.
+        Clauses are "quoted phrases", prefix* terms and plain terms.
+        """
+        clauses = []
+        for quoted, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if quoted:
+                clauses.append(self.phrase(quoted))
+            elif word.endswith("*") and tokenize(word):
+                clauses.append(self.prefix(tokenize(word)[0]))
+            else:
+                clauses.extend(self.term(t) for t in tokenize(word))
+        if not clauses:
+            return np.zeros(0, dtype=np.int64)
+        return self._intersect(clauses)
+
+    def to_dataframe(self, positions: np.ndarray) -> pd.DataFrame:
+        """
+        Materializes cue positions as rows of
+        ['index', 'start_seconds', 'end_seconds', 'text'].
+        """
+        cue_ids, starts, ends = self.cue_ids, self.starts, self.ends
+        if self._delta_cues:
+            delta = np.asarray(self._delta_cues, dtype=np.float64)
+            cue_ids = np.concatenate((cue_ids, delta[:, 0].astype(np.int64)))
+            starts = np.concatenate((starts, delta[:, 1]))
+            ends = np.concatenate((ends, delta[:, 2]))
+        return pd.DataFrame({
+            "index": cue_ids[positions],
+            "start_seconds": starts[positions],
+            "end_seconds": ends[positions],
+            "text": [self.texts[p] for p in positions],
+        })
+
+    @staticmethod
+    def _intersect(postings_lists: list) -> np.ndarray:
+        # Start from the shortest list so each step shrinks quickly
+        postings_lists = sorted(postings_lists, key=len)
+        result = postings_lists[0]
+        for other in postings_lists[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, other, assume_unique=True)
+        return result
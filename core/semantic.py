@@ -0,0 +1,320 @@
+# transcript_clusterviz/core/semantic.py
+
+import os
+import bisect
+import hashlib
+import pickle
+import sqlite3
+import zlib
+import numpy as np
+import pandas as pd
+import spacy as sp
+from core.search_index import tokenize
+from core.sparse_rows import SparseRows
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "transcript_clusterviz")
+
+# Boundaries whose windows are compared per vectorized step
+SIMILARITY_CHUNK = 20000
+
+# Keys per SQL query when reading cached vectors
+SQL_CHUNK = 900
+
+# Only static word vectors are needed for Doc.vector
+UNUSED_COMPONENTS = ["tok2vec", "tagger", "morphologizer", "parser", "senter",
+                     "attribute_ruler", "lemmatizer", "ner"]
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class VectorCache:
+    """
+    A persistent text-hash -> vector mapping in one SQLite file per embedding backend.
+
+    Only the vectors of the texts being clustered are read, and new vectors
+    are appended in one transaction. Once more than max_entries vectors are
+    stored, the oldest are evicted.
+    """
+
+    def __init__(self, name: str, cache_dir: str = None, max_entries: int = 2_000_000):
+        cache_dir = DEFAULT_CACHE_DIR if cache_dir is None else cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, f"vectors_{name}.sqlite")
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (key BLOB PRIMARY KEY, vector BLOB)")
+
+    def get_many(self, keys) -> dict:
+        """
+        Returns {key: vector} for the keys that are cached.
+        """
+        keys = list(keys)
+        found = {}
+        for chunk in range(0, len(keys), SQL_CHUNK):
+            batch = keys[chunk:chunk + SQL_CHUNK]
+            rows = self.connection.execute(
+                "SELECT key, vector FROM vectors WHERE key IN "
+                f"({','.join('?' * len(batch))})", batch)
+            found.update((key, pickle.loads(vector)) for key, vector in rows)
+        return found
+
+    def put_many(self, vectors: dict):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+                ((key, pickle.dumps(vector, protocol=pickle.HIGHEST_PROTOCOL))
+                 for key, vector in vectors.items()))
+            # Rowids grow with insertion order, so the lowest ones are the oldest
+            self.connection.execute(
+                "DELETE FROM vectors WHERE rowid <= "
+                "(SELECT MAX(rowid) FROM vectors) - ?", (self.max_entries,))
+
+    def close(self):
+        self.connection.close()
+
+
+class SpacyEmbedder:
+    """
+    Dense document vectors from a spaCy model's static word vectors.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 256, n_process: int = -1):
+        self.nlp = sp.load(model_name, disable=UNUSED_COMPONENTS)
+        if self.nlp.vocab.vectors.shape[0] == 0:
+            raise OSError(f"spaCy model '{model_name}' has no word vectors.")
+        self.name = f"spacy_{model_name}"
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+    def embed(self, texts: list) -> list:
+        # Worker start-up only pays off on larger inputs
+        n_process = self.n_process if len(texts) > 4 * self.batch_size else 1
+        docs = self.nlp.pipe(texts, batch_size=self.batch_size, n_process=n_process)
+        return [doc.vector.astype(np.float32) for doc in docs]
+
+
+class HashingEmbedder:
+    """
+    CPU-only fallback: hashed bag-of-words term counts, weighted by TF-IDF at
+    clustering time. Uses crc32 so hashes are stable across runs for the cache.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.name = f"hashing_{n_features}"
+        self.n_features = n_features
+
+    def embed(self, texts: list) -> list:
+        rows = []
+        for text in texts:
+            hashed = [zlib.crc32(t.encode("utf-8")) % self.n_features
+                      for t in tokenize(text)]
+            indices, counts = np.unique(np.asarray(hashed, dtype=np.int32),
+                                        return_counts=True)
+            rows.append((indices.astype(np.int32), counts.astype(np.float32)))
+        return rows
+
+
+class SemanticSubClusterer:
+    """
+    Splits large time-based clusters by topic.
+
+    Within each cluster, the text of a window of cues before and after every
+    cue boundary is compared by cosine similarity. As in TextTiling, a boundary
+    is scored by its depth: how far the similarity rises from it to the
+    nearest peak on each side. Valleys at least as deep as the mean depth
+    minus half its standard deviation start a new sub-cluster, so the cut
+    adapts to how similar cues are under the embedding in use. Deepest
+    valleys are taken first and none may leave a topic shorter than
+    min_topic_size cues.
+    Window sums and similarities are computed for many boundaries at once
+    with array operations.
+
+    Text is embedded with a spaCy model (nlp.pipe in batches, unused
+    components disabled, multi-process) or, if no model with vectors is
+    installed, hashed TF-IDF vectors. Embeddings are cached by text hash on
+    disk, so re-running with a different threshold never re-embeds text.
+    """
+
+    def __init__(self, model_name="en_core_web_md", similarity_threshold=None,
+                 window=3, min_cluster_size=8, min_topic_size=4, batch_size=256,
+                 n_process=-1, cache_dir=None):
+        """
+        :param model_name: spaCy model with word vectors (falls back to TF-IDF if missing)
+        :param similarity_threshold: Split at valleys where adjacent windows are less similar
+                                     than this (0-1); None uses the relative depth cutoff
+        :param window: Number of cues on each side of a boundary to compare
+        :param min_cluster_size: Clusters with fewer subtitles are never split
+        :param min_topic_size: Fewest subtitles in a sub-cluster
+        """
+        self.window = window
+        self.min_cluster_size = min_cluster_size
+        self.min_topic_size = min_topic_size
+        try:
+            self.embedder = SpacyEmbedder(model_name, batch_size, n_process)
+        except OSError as e:
+            print(f"DEBUG: spaCy model unavailable ({e}); using TF-IDF fallback")
+            self.embedder = HashingEmbedder()
+        self.similarity_threshold = similarity_threshold
+        self.cache = VectorCache(self.embedder.name, cache_dir)
+
+    def vectorize(self, texts: list):
+        """
+        Returns L2-normalized vectors for texts, one row per text: a dense array
+        for spaCy vectors, or a SparseRows TF-IDF matrix for the fallback.
+        """
+        keys = [text_hash(t) for t in texts]
+        vectors = self.cache.get_many(set(keys))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+        if missing:
+            print(f"DEBUG: Embedding {len(missing)} new texts with {self.embedder.name}")
+            embedded = dict(zip(missing, self.embedder.embed(list(missing.values()))))
+            self.cache.put_many(embedded)
+            vectors.update(embedded)
+
+        if isinstance(self.embedder, HashingEmbedder):
+            counts = SparseRows.from_rows(
+                [vectors[k] for k in keys], self.embedder.n_features)
+            idf = np.log((1 + counts.n_rows) / (1 + counts.column_counts())) + 1
+            tfidf = counts.scale_columns(idf)
+            norms = tfidf.row_norms()
+            return tfidf.scale_rows(1 / np.where(norms > 0, norms, 1))
+
+        matrix = np.vstack([vectors[k] for k in keys]) if keys else np.zeros((0, 0))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1)
+
+    def sub_cluster(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds a 'sub_cluster_id' column (restarting at 0 in each cluster) to a
+        DataFrame produced by time-based clustering.
+        """
+        if "cluster_id" not in df.columns:
+            raise ValueError("Semantic sub-clustering requires time-based clusters.")
+        df = df.sort_values(["cluster_id", "start_seconds"], kind="mergesort")
+        df = df.reset_index(drop=True)
+        n = len(df)
+
+        # Row range [cluster_start, cluster_end) of each row's cluster
+        _, first, sizes = np.unique(
+            df["cluster_id"].to_numpy(), return_index=True, return_counts=True)
+        cluster_start = np.repeat(first, sizes)
+        cluster_end = cluster_start + np.repeat(sizes, sizes)
+
+        # Candidate boundaries between row i and i + 1 inside large clusters
+        rows = np.arange(n)
+        candidates = rows[(rows + 1 < cluster_end)
+                          & (cluster_end - cluster_start >= self.min_cluster_size)]
+
+        new_sub = np.zeros(n, dtype=bool)
+        if len(candidates):
+            vectors = self.vectorize(df["text"].tolist())
+            similarity = np.empty(len(candidates))
+            for chunk in range(0, len(candidates), SIMILARITY_CHUNK):
+                cand = candidates[chunk:chunk + SIMILARITY_CHUNK]
+                left_lo = np.maximum(cand - self.window + 1, cluster_start[cand])
+                right_hi = np.minimum(cand + 1 + self.window, cluster_end[cand])
+                similarity[chunk:chunk + len(cand)] = self._window_similarity(
+                    vectors, left_lo, cand + 1, right_hi)
+            boundaries = self._select_boundaries(
+                candidates, similarity, cluster_start, cluster_end)
+            new_sub[boundaries + 1] = True
+
+        sub_ids = np.cumsum(new_sub)
+        df["sub_cluster_id"] = (sub_ids - sub_ids[cluster_start]).astype(np.int64)
+        print(f"DEBUG: Semantic sub-clustering split {int(new_sub.sum())} boundaries")
+        return df
+
+    def _select_boundaries(self, candidates, similarity, cluster_start, cluster_end):
+        """
+        Returns the candidate boundaries that start a new sub-cluster.
+        """
+        depth, valley = _depth_scores(similarity, cluster_start[candidates])
+        if not valley.any():
+            return candidates[:0]
+        if self.similarity_threshold is None:
+            cutoff = depth[valley].mean() - depth[valley].std() / 2
+            chosen = np.flatnonzero(valley & (depth >= cutoff))
+        else:
+            chosen = np.flatnonzero(valley & (similarity < self.similarity_threshold))
+
+        # Deepest first; a sub-cluster starts at row boundary + 1
+        accepted = []
+        for i in chosen[np.argsort(-depth[chosen], kind="mergesort")]:
+            start = candidates[i] + 1
+            pos = bisect.bisect_left(accepted, start)
+            prev_start = max(accepted[pos - 1] if pos else -1, cluster_start[start])
+            next_start = min(accepted[pos] if pos < len(accepted) else cluster_end[start],
+                             cluster_end[start])
+            if start - prev_start >= self.min_topic_size and \
+                    next_start - start >= self.min_topic_size:
+                accepted.insert(pos, start)
+        return np.asarray(accepted, dtype=np.int64) - 1
+
+    @staticmethod
+    def _window_similarity(vectors, left_lo, mid, right_hi) -> np.ndarray:
+        """
+        Cosine similarity between the summed rows [left_lo, mid) and [mid, right_hi).
+        """
+        if isinstance(vectors, SparseRows):
+            left = vectors.window_sums(left_lo, mid)
+            right = vectors.window_sums(mid, right_hi)
+            dots = left.row_dot(right)
+            denom = left.row_norms() * right.row_norms()
+        else:
+            left = np.add.reduceat(vectors[_expand(left_lo, mid)],
+                                   _segment_starts(left_lo, mid))
+            right = np.add.reduceat(vectors[_expand(mid, right_hi)],
+                                    _segment_starts(mid, right_hi))
+            dots = np.einsum("ij,ij->i", left, right)
+            denom = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+        # Windows without any text (e.g., only placeholders) never force a split
+        return np.where(denom > 0, dots / np.where(denom > 0, denom, 1), 1.0)
+
+
+def _depth_scores(similarity: np.ndarray, group: np.ndarray):
+    """
+    TextTiling depth scores of a similarity sequence made of runs (one per group).
+    From each boundary, similarity is climbed on each side while it does not
+    decrease; the depth is the sum of both rises. Returns (depth, valley), where
+    valley marks local minima.
+    """
+    n = len(similarity)
+    positions = np.arange(n)
+    first = np.r_[True, group[1:] != group[:-1]]
+    last = np.r_[group[1:] != group[:-1], True]
+    falls = similarity[1:] < similarity[:-1]
+    rises = similarity[1:] > similarity[:-1]
+
+    # The left climb from i stops at the last position at or before i with a
+    # lower left neighbour; the right climb at the first with a lower right one
+    left_stop = first | np.r_[False, rises]
+    right_stop = last | np.r_[falls, False]
+    left_peak = similarity[np.maximum.accumulate(np.where(left_stop, positions, 0))]
+    right_peak = similarity[np.minimum.accumulate(
+        np.where(right_stop, positions, n - 1)[::-1])[::-1]]
+    depth = left_peak + right_peak - 2 * similarity
+
+    valley = ((first | np.r_[False, falls]) & (last | ~np.r_[falls, False])
+              & (depth > 0))
+    return depth, valley
+
+
+def _expand(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Concatenation of the ranges lo[i]..hi[i]-1.
+    """
+    lengths = hi - lo
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(lo - offsets, lengths) + np.arange(lengths.sum())
+
+
+def _segment_starts(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    lengths = hi - lo
+    return np.cumsum(lengths) - lengths
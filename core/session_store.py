@@ -0,0 +1,161 @@
+# transcript_clusterviz/core/session_store.py
+"""
+Single-file binary session format for analysed transcripts.
+
+Layout:
+    8 bytes   magic b"CVZSESS" + format version byte
+    8 bytes   little-endian length of the JSON header
+    header    JSON: settings, frame column lists, array dtypes/shapes/offsets
+    arrays    raw little-endian array data, each aligned to 64 bytes
+
+Numeric arrays are read back as zero-copy views over a read-only mmap of the
+file. String columns are stored as one UTF-8 blob plus character offsets, so
+they are decoded in a single pass rather than parsed one by one. Unless a
+string contains NUL, the blob separates strings with NUL and is split with
+str.split instead of being sliced.
+"""
+
+import json
+import mmap
+import os
+import struct
+import numpy as np
+import pandas as pd
+
+MAGIC = b"CVZSESS\x01"
+ALIGNMENT = 64
+
+
+def _encode_strings(values) -> tuple:
+    """
+    Returns (offsets, blob, separated). Offsets are character positions in the
+    decoded blob, which includes the NUL separators if separated is True.
+    """
+    strings = ["" if v is None or v is pd.NA or (isinstance(v, float) and np.isnan(v))
+               else str(v) for v in values]
+    text = "\0".join(strings)
+    separated = text.count("\0") == max(len(strings) - 1, 0)
+    if not separated:
+        text = "".join(strings)
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    offsets = np.concatenate(([0], np.cumsum(lengths + separated)))
+    blob = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return offsets, blob, separated
+
+
+def _decode_strings(offsets: np.ndarray, blob: np.ndarray, separated: bool) -> list:
+    text = blob.tobytes().decode("utf-8")
+    if separated:
+        return text.split("\0") if len(offsets) > 1 else []
+    bounds = offsets.tolist()
+    return [text[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def _is_string_column(series: pd.Series) -> bool:
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+def write_session(path: str, frames: dict, arrays: dict = None,
+                  string_arrays: dict = None, settings: dict = None):
+    """
+    Writes DataFrames, numeric arrays, string lists and JSON settings to one file.
+    :param frames: name -> DataFrame (numeric, bool and string columns)
+    :param arrays: name -> numeric numpy array
+    :param string_arrays: name -> list of strings
+    """
+    blobs = {}
+    header = {"settings": settings or {}, "frames": {}, "strings": [], "separated": [],
+              "arrays": {}}
+
+    def add_strings(key, values):
+        blobs[key + ".offsets"], blobs[key + ".blob"], separated = _encode_strings(values)
+        header["strings"].append(key)
+        if separated:
+            header["separated"].append(key)
+
+    for name, df in frames.items():
+        columns = []
+        for column in df.columns:
+            key = f"{name}/{column}"
+            if _is_string_column(df[column]):
+                add_strings(key, df[column])
+            else:
+                blobs[key] = df[column].to_numpy()
+            columns.append(column)
+        header["frames"][name] = columns
+    for name, array in (arrays or {}).items():
+        blobs[name] = np.asarray(array)
+    for name, values in (string_arrays or {}).items():
+        add_strings(name, values)
+
+    # Lay out arrays after the header, each aligned for direct mmap views
+    position = 0
+    for name, array in blobs.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.byteorder == ">":
+            array = array.astype(array.dtype.newbyteorder("<"))
+        blobs[name] = array
+        header["arrays"][name] = {
+            "dtype": array.dtype.str, "shape": list(array.shape), "offset": position}
+        position += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = -(-(16 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in blobs.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + position)
+    os.replace(tmp_path, path)
+
+
+def read_session(path: str) -> tuple:
+    """
+    Reads a session file written by write_session.
+    Returns (frames, arrays, string_arrays, settings). Numeric data are read-only
+    views over a memory map of the file.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a ClusterViz session file: {path}")
+        (header_length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_length))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    data_start = -(-(16 + header_length) // ALIGNMENT) * ALIGNMENT
+
+    def array(name):
+        spec = header["arrays"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        return np.frombuffer(buffer, dtype=dtype, count=count,
+                             offset=data_start + spec["offset"]).reshape(spec["shape"])
+
+    strings = set(header["strings"])
+    separated = set(header.get("separated", []))
+
+    def string_list(name):
+        return _decode_strings(array(name + ".offsets"), array(name + ".blob"),
+                               name in separated)
+
+    frames = {}
+    for name, columns in header["frames"].items():
+        data = {}
+        for column in columns:
+            key = f"{name}/{column}"
+            if key in strings:
+                data[column] = string_list(key)
+            else:
+                data[column] = array(key)
+        frames[name] = pd.DataFrame(data, copy=False)
+
+    framed = {f"{name}/{c}" for name, columns in header["frames"].items() for c in columns}
+    string_arrays = {name: string_list(name) for name in strings if name not in framed}
+    string_parts = {f"{name}.offsets" for name in strings} | {f"{name}.blob" for name in strings}
+    arrays = {name: array(name) for name in header["arrays"]
+              if name not in framed and name not in string_parts}
+    return frames, arrays, string_arrays, header["settings"]
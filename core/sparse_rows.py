@@ -0,0 +1,138 @@
+# transcript_clusterviz/core/sparse_rows.py
+
+import numpy as np
+
+
+class SparseRows:
+    """
+    A minimal numpy-only CSR matrix: row i has column indices
+    indices[indptr[i]:indptr[i+1]] (sorted, unique) and matching values in data.
+
+    Covers only the row-wise operations the text pipelines need (window sums,
+    row aggregation, dot products, top-k). scipy.sparse is not used since it
+    pulls in the stdlib `unittest` module, which this repo's `unittest/`
+    package shadows when the app runs from the project root.
+    """
+
+    def __init__(self, indptr, indices, data, n_cols):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.float64)
+        self.n_cols = n_cols
+
+    @property
+    def n_rows(self):
+        return len(self.indptr) - 1
+
+    @classmethod
+    def from_rows(cls, rows: list, n_cols: int) -> "SparseRows":
+        """
+        Builds the matrix from a list of (indices, values) pairs with unique indices.
+        """
+        lengths = np.fromiter((len(r[0]) for r in rows), dtype=np.int64, count=len(rows))
+        indices = np.concatenate([r[0] for r in rows]) if rows else np.zeros(0)
+        data = np.concatenate([r[1] for r in rows]) if rows else np.zeros(0)
+        matrix = cls(np.concatenate(([0], np.cumsum(lengths))), indices, data, n_cols)
+        return matrix.sort_indices()
+
+    @classmethod
+    def from_coo(cls, rows, cols, vals, n_rows: int, n_cols: int) -> "SparseRows":
+        """
+        Builds the matrix from coordinate triples, summing duplicate (row, col) entries.
+        """
+        keys = np.asarray(rows, dtype=np.int64) * n_cols + np.asarray(cols, dtype=np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        data = np.bincount(inverse, weights=vals, minlength=len(unique_keys))
+        row_of = unique_keys // n_cols
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(row_of, minlength=n_rows))))
+        return cls(indptr, unique_keys % n_cols, data, n_cols)
+
+    def sort_indices(self) -> "SparseRows":
+        rows = self.row_ids()
+        order = np.lexsort((self.indices, rows))
+        self.indices = self.indices[order]
+        self.data = self.data[order]
+        return self
+
+    def row_ids(self) -> np.ndarray:
+        """
+        Row number of every stored entry.
+        """
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def gather(self, row_ids: np.ndarray):
+        """
+        Returns (position, cols, vals) for the entries of the given rows, where
+        position is the index into row_ids each entry came from.
+        """
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        starts = self.indptr[row_ids]
+        lengths = self.indptr[row_ids + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        entries = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        positions = np.repeat(np.arange(len(row_ids)), lengths)
+        return positions, self.indices[entries], self.data[entries]
+
+    def aggregate_rows(self, groups: np.ndarray, n_groups: int) -> "SparseRows":
+        """
+        Sums rows into n_groups output rows; row i is added to output row groups[i].
+        """
+        rows = np.asarray(groups, dtype=np.int64)[self.row_ids()]
+        return SparseRows.from_coo(rows, self.indices, self.data, n_groups, self.n_cols)
+
+    def window_sums(self, lo: np.ndarray, hi: np.ndarray) -> "SparseRows":
+        """
+        Returns a matrix whose row r is the sum of rows lo[r]..hi[r]-1.
+        """
+        lo = np.asarray(lo, dtype=np.int64)
+        hi = np.asarray(hi, dtype=np.int64)
+        lengths = hi - lo
+        offsets = np.cumsum(lengths) - lengths
+        members = np.repeat(lo - offsets, lengths) + np.arange(lengths.sum())
+        positions, cols, vals = self.gather(members)
+        windows = np.repeat(np.arange(len(lo)), lengths)[positions]
+        return SparseRows.from_coo(windows, cols, vals, len(lo), self.n_cols)
+
+    def scale_columns(self, weights: np.ndarray) -> "SparseRows":
+        return SparseRows(self.indptr, self.indices, self.data * weights[self.indices],
+                          self.n_cols)
+
+    def scale_rows(self, weights: np.ndarray) -> "SparseRows":
+        return SparseRows(self.indptr, self.indices,
+                          self.data * np.repeat(weights, np.diff(self.indptr)), self.n_cols)
+
+    def row_sums(self) -> np.ndarray:
+        return np.bincount(self.row_ids(), weights=self.data, minlength=self.n_rows)
+
+    def row_norms(self) -> np.ndarray:
+        return np.sqrt(np.bincount(self.row_ids(), weights=self.data ** 2,
+                                   minlength=self.n_rows))
+
+    def column_counts(self) -> np.ndarray:
+        """
+        Number of rows with a nonzero entry in each column (document frequency).
+        """
+        return np.bincount(self.indices, minlength=self.n_cols)
+
+    def row_dot(self, other: "SparseRows") -> np.ndarray:
+        """
+        Dot product of row i of self with row i of other, for every i.
+        """
+        keys = self.row_ids() * self.n_cols + self.indices
+        other_keys = other.row_ids() * other.n_cols + other.indices
+        _, mine, theirs = np.intersect1d(keys, other_keys, assume_unique=True,
+                                         return_indices=True)
+        return np.bincount(self.row_ids()[mine],
+                           weights=self.data[mine] * other.data[theirs],
+                           minlength=self.n_rows)
+
+    def top_k(self, k: int):
+        """
+        Returns (rows, cols, vals) of the k largest entries of every row, ordered
+        by row then descending value.
+        """
+        rows = self.row_ids()
+        order = np.lexsort((-self.data, rows))
+        rank = np.arange(len(order)) - np.repeat(self.indptr[:-1], np.diff(self.indptr))
+        keep = order[rank < k]
+        return rows[keep], self.indices[keep], self.data[keep]
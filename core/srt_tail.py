@@ -0,0 +1,60 @@
+# transcript_clusterviz/core/srt_tail.py
+
+import os
+import re
+import pandas as pd
+from core.parse_srt import SRTParser
+
+# A blank line terminates an SRT block; '\n' is ASCII so this never splits a UTF-8 character
+BLOCK_END = re.compile(rb"\r?\n[ \t]*\r?\n")
+
+
+class SRTTailReader:
+    """
+    Follows an .srt file that is being appended to (e.g., live captions).
+
+    Each call to read_new() reads from the last consumed byte offset and parses
+    only the complete subtitle blocks that have been written since. A trailing
+    block without its terminating blank line is left for the next call.
+    """
+
+    def __init__(self, filepath: str, parser: SRTParser = None):
+        self.filepath = filepath
+        self.parser = parser if parser is not None else SRTParser()
+        self.offset = 0
+        self.next_index = 1
+
+    def is_truncated(self) -> bool:
+        """
+        True if the file shrank below the consumed offset (rewritten or rotated).
+        """
+        return os.path.getsize(self.filepath) < self.offset
+
+    def reset(self):
+        self.offset = 0
+        self.next_index = 1
+
+    def read_new(self, final: bool = False) -> pd.DataFrame:
+        """
+        Parses the subtitles appended since the last call.
+        :param final: Also consume a trailing block that has no blank line after it
+        """
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        if final:
+            consumed = len(data)
+        else:
+            consumed = 0
+            for match in BLOCK_END.finditer(data):
+                consumed = match.end()
+
+        if consumed == 0:
+            return self.parser.parse_string("", start_index=self.next_index)
+
+        chunk = data[:consumed].decode('utf-8-sig' if self.offset == 0 else 'utf-8')
+        self.offset += consumed
+        df = self.parser.parse_string(chunk, start_index=self.next_index)
+        self.next_index += len(df)
+        return df
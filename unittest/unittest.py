@@ -1,8 +1,362 @@
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
 import pytest
+import numpy as np
+import pandas as pd
 from core.parse_srt import SRTParser
+from core.search_index import SubtitleSearchIndex
+from core.interval_index import IntervalIndex
+from core.clustering import assign_time_clusters
+from core.corpus import TranscriptCorpus
+from core.sparse_rows import SparseRows
+from core.keywords import ClusterKeywordExtractor
+from core.semantic import SemanticSubClusterer
+from api.cache import ResultCache
+from api.server import AnalysisService, error_status, make_server
+from core.session_store import write_session, read_session
+from core.srt_tail import SRTTailReader
+from controllers.parse_controller import ParseController
 
 def test_parse_file():
     parser = SRTParser()
     df = parser.parse_file("sampleStream.srt")
     assert not df.empty
     assert 'word_count' in df.columns
+
+def test_search_index_queries():
+    df = pd.DataFrame({
+        "index": [1, 2, 3],
+        "start_seconds": [0.0, 4.0, 9.0],
+        "end_seconds": [3.0, 8.0, 12.0],
+        "text": ["all right there it goes", "there it is", "going right away"],
+    })
+    index = SubtitleSearchIndex.from_dataframe(df)
+    assert list(index.term("there")) == [0, 1]
+    assert list(index.prefix("go")) == [0, 2]
+    assert list(index.phrase("right there")) == [0]
+    assert list(index.search('"there it" goes')) == [0]
+    assert index.to_dataframe(index.search("away"))["index"].tolist() == [3]
+
+
+def test_interval_index_overlaps():
+    df = pd.DataFrame({
+        "start_seconds": [39.0, 41.52, 48.84, 50.34, 100.0],
+        "end_seconds": [44.719, 44.719, 52.64, 52.64, 104.0],
+    })
+    index = IntervalIndex.from_dataframe(df)
+    # Cue 0 starts before the window but still overlaps it
+    assert list(index.query(42.0, 49.0)) == [0, 1, 2]
+    assert list(index.query(51.0, 51.0)) == [2, 3]
+    assert list(index.query(60.0, 90.0)) == []
+
+
+def test_interval_index_long_cues_match_brute_force():
+    rng = np.random.default_rng(1)
+    starts = np.sort(rng.random(2000) * 3600)
+    ends = starts + rng.random(2000) * 5
+    ends[[10, 500]] = [3600.0, 2000.0]  # cues that span much of the stream
+    index = IntervalIndex(starts[:1000], ends[:1000], np.arange(1000))
+    index.append(starts[1000:], ends[1000:], np.arange(1000, 2000))
+    for start in rng.random(50) * 3600:
+        expected = np.flatnonzero((starts < start + 10) & (ends > start))
+        assert index.query(start, start + 10).tolist() == expected.tolist()
+
+
+def test_tail_reader_partial_block_bom_and_truncation(tmp_path):
+    path = tmp_path / "live.srt"
+    path.write_bytes("\ufeff1\n00:00:01,000 --> 00:00:02,000\ncafé\n\n2\n00:00:03,000 --> 00:00:04,000\nhal".encode("utf-8"))
+    reader = SRTTailReader(str(path))
+    first = reader.read_new()
+    assert first["index"].tolist() == [1]
+    assert first["text"].tolist() == ["café"]
+    assert reader.read_new().empty  # block 2 has no blank line yet
+
+    with open(path, "ab") as f:
+        f.write(b"f done\n\n")
+    second = reader.read_new()
+    assert second["index"].tolist() == [2]
+    assert second["text"].tolist() == ["half done"]
+
+    path.write_bytes(b"1\n00:00:05,000 --> 00:00:06,000\nnew\n")
+    assert reader.is_truncated()
+    reader.reset()
+    assert reader.read_new(final=True)["text"].tolist() == ["new"]
+
+
+def test_poll_tail_matches_full_rebuild(tmp_path):
+    data = open("sampleStream.srt", "rb").read()
+    path = tmp_path / "live.srt"
+    path.write_bytes(b"")
+    tailed = ParseController(gap_threshold=5.0, bin_size=60)
+    tailed.start_tail(str(path))
+
+    keywords = {}
+
+    def poll():
+        new_rows, density_delta, full_refresh = tailed.poll_tail()
+        if full_refresh:
+            if tailed.current_df is not None:
+                # Later polls rescore only the clusters they touch
+                keywords_df = tailed.cluster_keywords()
+                keywords.update(zip(keywords_df["cluster_id"], keywords_df["keywords"]))
+            return None
+        if new_rows.empty:
+            return None
+        # Only the bins the new cues fall in are reported
+        assert set(density_delta["bin_index"]) == \
+            set((new_rows["start_seconds"] // 60).astype(int))
+        touched = tailed.tail_keywords(new_rows)
+        assert touched["cluster_id"].tolist() == sorted(new_rows["cluster_id"].unique())
+        keywords.update(zip(touched["cluster_id"], touched["keywords"]))
+        return touched, tailed.tail_density_keywords(density_delta, keywords)
+
+    # Append random-sized chunks, which often end mid-block
+    rng = np.random.default_rng(0)
+    position = 0
+    last_poll = None
+    while position < len(data):
+        step = int(rng.integers(1, 4000))
+        with open(path, "ab") as f:
+            f.write(data[position:position + step])
+        position += step
+        last_poll = poll() or last_poll
+    with open(path, "ab") as f:
+        f.write(b"\n\n")
+    last_poll = poll() or last_poll
+    touched, delta_keywords = last_poll
+
+    full = ParseController(gap_threshold=5.0, bin_size=60)
+    full.parse_srt_file(str(path))
+    full.cluster_by_time()
+    columns = ["index", "start_seconds", "end_seconds", "cluster_id"]
+    assert tailed.current_df[columns].reset_index(drop=True).equals(
+        full.current_df[columns].reset_index(drop=True))
+    assert tailed._density_counts.tolist() == \
+        full.calculate_density()["words_per_bin"].tolist()
+    assert tailed.search("right")["index"].tolist() == full.search("right")["index"].tolist()
+    assert tailed.query_time_range(100, 400)["index"].tolist() == \
+        full.query_time_range(100, 400)["index"].tolist()
+    full_keywords = full.cluster_keywords()
+    assert touched.reset_index(drop=True).equals(full_keywords[
+        full_keywords["cluster_id"].isin(touched["cluster_id"])].reset_index(drop=True))
+    assert tailed.cluster_keywords().equals(full_keywords)
+    full_density = full.add_density_keywords(full.calculate_density(), full_keywords)
+    assert delta_keywords["keywords"].tolist() == full_density.set_index("bin_index").loc[
+        delta_keywords["bin_index"], "keywords"].tolist()
+
+    # After a bin size change the delta covers every bin, so it is a full refresh
+    tailed.bin_size = 30
+    with open(path, "ab") as f:
+        f.write(b"1000\n10:00:00,000 --> 10:00:02,000\nlater cue\n\n")
+    _, density_delta, full_refresh = tailed.poll_tail()
+    assert full_refresh
+    assert density_delta["words_per_bin"].sum() == tailed.current_df["word_count"].sum()
+
+    # A cue that starts before the last one forces a rebuild
+    with open(path, "ab") as f:
+        f.write(b"999\n00:00:01,000 --> 00:00:02,000\nlate cue\n\n")
+    _, _, full_refresh = tailed.poll_tail()
+    assert full_refresh
+    assert tailed.current_df["start_seconds"].is_monotonic_increasing
+
+
+def test_assign_time_clusters_per_source():
+    df = pd.DataFrame({
+        "source_id": [1, 0, 0, 1, 0],
+        "start_seconds": [0.0, 0.0, 2.0, 20.0, 30.0],
+        "end_seconds": [1.0, 1.5, 3.0, 21.0, 31.0],
+    })
+    clustered = assign_time_clusters(df, gap_threshold=5.0, by="source_id")
+    assert clustered["source_id"].tolist() == [0, 0, 0, 1, 1]
+    assert clustered["cluster_id"].tolist() == [0, 0, 1, 0, 1]
+
+
+def test_corpus_spills_over_memory_budget(tmp_path):
+    blocks = open("sampleStream.srt", encoding="utf-8").read().split("\n\n")
+    paths = []
+    for i, count in enumerate([40, 80, 20]):
+        path = tmp_path / f"stream_{i}.srt"
+        path.write_text("\n\n".join(blocks[:count]) + "\n\n", encoding="utf-8")
+        paths.append(str(path))
+
+    in_memory = TranscriptCorpus(max_workers=2)
+    in_memory.load(paths)
+    # Room for the first transcript only; the rest spill in file order
+    budget_mb = (in_memory.sources["memory_bytes"].iloc[0] + 1) / (1024 * 1024)
+    spilling = TranscriptCorpus(memory_budget_mb=budget_mb, max_workers=2)
+    spilling.load(paths)
+    try:
+        assert spilling.sources["spilled"].tolist() == [False, True, True]
+        assert spilling.cluster_summary().equals(in_memory.cluster_summary())
+        assert spilling.calculate_density().equals(in_memory.calculate_density())
+    finally:
+        spilling.close()
+        in_memory.close()
+
+
+def test_sparse_rows_window_sums_and_top_k():
+    rows = [([0, 2], [1.0, 2.0]), ([2], [3.0]), ([1, 2], [4.0, 1.0])]
+    matrix = SparseRows.from_rows(rows, n_cols=3)
+    windows = matrix.window_sums([0, 1], [2, 3])
+    assert windows.indices.tolist() == [0, 2, 1, 2]
+    assert windows.data.tolist() == [1.0, 5.0, 4.0, 4.0]
+    assert windows.row_dot(windows).tolist() == [26.0, 32.0]
+    top_rows, top_cols, _ = matrix.top_k(1)
+    assert top_rows.tolist() == [0, 1, 2]
+    assert top_cols.tolist() == [2, 2, 1]
+
+
+def test_semantic_sub_cluster_splits_topics_and_reuses_vectors(tmp_path):
+    texts = ["knight draws sword near castle walls"] * 10 + \
+        ["mix flour with butter then bake"] * 10
+    df = pd.DataFrame({
+        "index": range(1, 21),
+        "start_seconds": [float(i) for i in range(20)],
+        "text": texts,
+        "cluster_id": 0,
+    })
+    # No spaCy model by that name, so the TF-IDF fallback is used
+    clusterer = SemanticSubClusterer(model_name="missing_model", cache_dir=str(tmp_path))
+    assert clusterer.sub_cluster(df)["sub_cluster_id"].tolist() == [0] * 10 + [1] * 10
+
+    clusterer.embedder.embed = lambda texts: pytest.fail("cached texts were re-embedded")
+    clusterer.similarity_threshold = 0.0
+    assert clusterer.sub_cluster(df)["sub_cluster_id"].tolist() == [0] * 20
+
+
+def test_semantic_sub_cluster_sample_split_count(tmp_path):
+    controller = ParseController()
+    controller.parse_srt_file("sampleStream.srt")
+    clusters = controller.cluster_by_time()
+    controller.semantic_clusterer = SemanticSubClusterer(
+        model_name="missing_model", cache_dir=str(tmp_path))
+    df = controller.semantic_sub_cluster()
+
+    # 219 time clusters; the 47 with 8+ cues hold 932 cues
+    sizes = clusters.groupby("cluster_id").size()
+    large = sizes[sizes >= 8]
+    topics = df.groupby(["cluster_id", "sub_cluster_id"]).size()
+    assert len(sizes) < len(topics) <= len(sizes) + large.sum() // 8
+    split = topics[topics.index.get_level_values("cluster_id").isin(large.index)]
+    assert split.min() >= controller.semantic_clusterer.min_topic_size
+
+
+def test_cluster_keywords_incremental_matches_full():
+    df = pd.DataFrame({
+        "index": [1, 2, 3, 4],
+        "start_seconds": [0.0, 2.0, 10.0, 12.0],
+        "end_seconds": [1.0, 3.0, 11.0, 13.0],
+        "text": ["dragon boss fight", "the dragon again", "inventory menu", "menu settings"],
+    })
+    extractor = ClusterKeywordExtractor(top_k=1).fit(df)
+    split = assign_time_clusters(df, gap_threshold=5.0)
+    assert extractor.extract(split)["keywords"].tolist() == ["dragon", "menu"]
+    merged = assign_time_clusters(df, gap_threshold=20.0)
+    full = ClusterKeywordExtractor(top_k=1).fit(df).extract(merged)
+    assert extractor.extract(merged).equals(full)
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put(("a", "parse"), 1)
+    cache.put(("b", "parse"), 2)
+    assert cache.get(("a", "parse")) == 1
+    cache.put(("c", "parse"), 3)
+    assert cache.get(("b", "parse")) is None
+    assert cache.get_or_compute(("a", "parse"), lambda: 99) == 1
+    assert cache.get_or_compute(("d", "parse"), lambda: 4) == 4
+
+
+def test_result_cache_computes_concurrent_misses_once():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        cache.get_or_compute(("a", "parse"), compute))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [42] * 4
+    assert len(calls) == 1
+
+
+def test_batch_rejects_non_object_requests():
+    service = AnalysisService(max_workers=1)
+    try:
+        [(result, error)] = service.run_batch(["x"])
+        assert result is None and error_status(error) == 400
+    finally:
+        service.shutdown()
+
+
+def test_api_endpoints(capsys):
+    service = AnalysisService(max_workers=2)
+    server = make_server(port=0, service=service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    path = os.path.abspath("sampleStream.srt")
+
+    def post(endpoint, body):
+        request = urllib.request.Request(
+            url + endpoint, data=json.dumps(body).encode("utf-8"), method="POST")
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    try:
+        status, cluster = post("/cluster", {"path": path, "gap_threshold": 5.0})
+        assert status == 200 and cluster["rows"] == 1301
+        assert max(cluster["data"]["cluster_id"]) == 218
+        status, density = post("/density", {"path": path, "bin_size": 60})
+        assert status == 200 and "words_per_bin" in density["columns"]
+
+        status, batch = post("/batch", {"requests": [
+            {"op": "density", "path": path, "bin_size": 60},
+            {"op": "cluster", "path": path, "gap_threshold": -1},
+            {"op": "parse", "path": path + ".missing"}]})
+        assert status == 200
+        assert batch["results"][0] == density
+        assert [r.get("status") for r in batch["results"][1:]] == [400, 404]
+
+        status, error = post("/density", {"path": path, "bin_size": 0})
+        assert status == 400 and "bin_size" in error["error"]
+        assert post("/cluster", [path])[0] == 400
+        assert post("/missing", {"path": path})[0] == 404
+        assert post("/parse", {"path": path + ".missing"})[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.shutdown()
+    # Requests are served without the controller's debug output
+    assert capsys.readouterr().out == ""
+
+
+def test_session_round_trip(tmp_path):
+    df = pd.DataFrame({
+        "index": [1, 2],
+        "start_seconds": [0.0, 4.0],
+        "text": ["café crème", ""],
+        "cluster_id": [0, 1],
+    })
+    path = str(tmp_path / "session.cvzs")
+    write_session(path, {"cues": df}, {"ids": [3, 1, 2]},
+                  {"vocab": ["a", "b"], "nul": ["x\0y", ""], "none": []}, {"bin_size": 60})
+    frames, arrays, string_arrays, settings = read_session(path)
+    assert frames["cues"].equals(df)
+    assert arrays["ids"].tolist() == [3, 1, 2]
+    assert string_arrays == {"vocab": ["a", "b"], "nul": ["x\0y", ""], "none": []}
+    assert settings == {"bin_size": 60}
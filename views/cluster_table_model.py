@@ -0,0 +1,124 @@
+# transcript_clusterviz/views/cluster_table_model.py
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+HEADERS = ["Index", "Start", "End", "Text", "Cluster ID", "Topic", "Keywords"]
+SOURCE_COLUMNS = ["index", "start_seconds", "end_seconds", "text",
+                  "cluster_id", "sub_cluster_id"]
+HIT_COLOR = QColor(255, 161, 90, 90)
+
+
+class ClusterTableModel(QAbstractTableModel):
+    """
+    Read-only table model over subtitle columns for the clustering tab.
+
+    Cells are formatted on demand, so only the rows on screen are turned into
+    text, however many subtitles are loaded. Search hits are shown as a row
+    background colour and keywords are looked up per cluster ID.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = {}
+        self.row_count = 0
+        self.keywords = {}
+        self.hit_indices = set()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return HIT_COLOR if self.columns["index"][row] in self.hit_indices else None
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+
+        column = index.column()
+        if column == 0:
+            return str(self.columns["index"][row])
+        if column == 1:
+            return f"{self.columns['start_seconds'][row]:.2f}"
+        if column == 2:
+            return f"{self.columns['end_seconds'][row]:.2f}"
+        if column == 3:
+            return str(self.columns["text"][row])
+        cluster_id = self.cluster_id_at(row)
+        if column == 4:
+            return "N/A" if cluster_id is None else str(cluster_id)
+        if column == 5:
+            sub_clusters = self.columns.get("sub_cluster_id")
+            if sub_clusters is None or pd.isna(sub_clusters[row]):
+                return ""
+            return str(int(sub_clusters[row]))
+        return self.keywords.get(cluster_id, "")
+
+    def set_frame(self, df: pd.DataFrame, keywords: dict = None):
+        """
+        Shows the rows of df, replacing the current contents.
+        """
+        self.beginResetModel()
+        # np.asarray on the array skips the missing-value scan of Series.to_numpy
+        self.columns = {c: np.asarray(df[c].array) for c in SOURCE_COLUMNS if c in df.columns}
+        self.row_count = len(df)
+        self.keywords = keywords or {}
+        self.endResetModel()
+
+    def clear(self):
+        self.set_frame(pd.DataFrame(columns=SOURCE_COLUMNS[:4]))
+
+    def append_rows(self, df: pd.DataFrame):
+        """
+        Appends the rows of df (e.g., subtitles read in live tail mode).
+        """
+        if df.empty:
+            return
+        if not self.row_count:
+            self.set_frame(df, self.keywords)
+            return
+        self.beginInsertRows(QModelIndex(), self.row_count, self.row_count + len(df) - 1)
+        # Columns the new rows lack (e.g., topics from an earlier split) are padded
+        self.columns = {
+            c: np.concatenate((values, np.asarray(df[c].array) if c in df.columns
+                               else np.full(len(df), np.nan)))
+            for c, values in self.columns.items()}
+        self.row_count += len(df)
+        self.endInsertRows()
+
+    def set_keywords(self, keywords: dict):
+        self.keywords = keywords
+        if self.row_count:
+            self.dataChanged.emit(self.index(0, 6), self.index(self.row_count - 1, 6))
+
+    def set_search_hits(self, hit_indices: set):
+        """
+        Colours the rows whose subtitle index is in hit_indices.
+        """
+        self.hit_indices = hit_indices
+        if self.row_count:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(self.row_count - 1, len(HEADERS) - 1),
+                [Qt.ItemDataRole.BackgroundRole])
+
+    def first_hit_row(self):
+        if not self.row_count or not self.hit_indices:
+            return None
+        rows = np.flatnonzero(np.isin(self.columns["index"], list(self.hit_indices)))
+        return int(rows[0]) if len(rows) else None
+
+    def cluster_id_at(self, row: int):
+        cluster_ids = self.columns.get("cluster_id")
+        return None if cluster_ids is None else cluster_ids[row]
@@ -1,16 +1,19 @@
 # transcript_clusterviz/views/main_window.py
 
 import os
-from PyQt6.QtCore import Qt
+import json
+import pandas as pd
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import (
     QMainWindow, QVBoxLayout, QWidget,
     QPushButton, QFileDialog, QHBoxLayout,
     QSizePolicy, QSlider, QLabel, QMessageBox, QTabWidget, QStatusBar,
-    QTableWidget, QTableWidgetItem
+    QTableView, QHeaderView, QLineEdit, QDoubleSpinBox
 )
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 from utils.export_worker import ExportWorker, ChartExportWorker
-from controllers.parse_controller import ParseController
+from controllers.parse_controller import ParseController, DENSITY_HOVER_TEMPLATE
+from views.cluster_table_model import ClusterTableModel
 
 
 class MainWindow(QMainWindow):
@@ -28,6 +31,29 @@ class MainWindow(QMainWindow):
         self.open_file_button = QPushButton("Open SRT File")
         self.open_file_button.clicked.connect(self.handle_open_file)
         toolbar_layout.addWidget(self.open_file_button)
+        self.tail_button = QPushButton("Live Tail SRT File")
+        self.tail_button.setCheckable(True)
+        self.tail_button.clicked.connect(self.handle_tail_toggle)
+        toolbar_layout.addWidget(self.tail_button)
+        self.open_corpus_button = QPushButton("Open Corpus")
+        self.open_corpus_button.clicked.connect(self.handle_open_corpus)
+        toolbar_layout.addWidget(self.open_corpus_button)
+        self.save_session_button = QPushButton("Save Session")
+        self.save_session_button.clicked.connect(self.handle_save_session)
+        toolbar_layout.addWidget(self.save_session_button)
+        self.open_session_button = QPushButton("Open Session")
+        self.open_session_button.clicked.connect(self.handle_open_session)
+        toolbar_layout.addWidget(self.open_session_button)
+
+        # Full-text search over subtitle text
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText(
+            'Search text: term, "a phrase" or prefix*')
+        self.search_input.returnPressed.connect(self.handle_search)
+        self.search_button = QPushButton("Search")
+        self.search_button.clicked.connect(self.handle_search)
+        toolbar_layout.addWidget(self.search_input)
+        toolbar_layout.addWidget(self.search_button)
         toolbar_widget.setLayout(toolbar_layout)
 
         # Tabs for clustering and density
@@ -38,19 +64,22 @@ class MainWindow(QMainWindow):
         # Clustering Tab
         self.cluster_button = QPushButton("Perform Time-Based Clustering")
         self.cluster_button.clicked.connect(self.handle_clustering)
-        self.cluster_table = QTableWidget()
-        # Number of columns: index, start, end, text, cluster_id
-        self.cluster_table.setColumnCount(5)
-        self.cluster_table.setHorizontalHeaderLabels(
-            ["Index", "Start", "End", "Text", "Cluster ID"])
+        # Columns: index, start, end, text, cluster_id, sub_cluster_id, keywords.
+        # The model formats only the visible rows, so large transcripts stay responsive.
+        self.cluster_model = ClusterTableModel(self)
+        self.cluster_table = QTableView()
+        self.cluster_table.setModel(self.cluster_model)
         self.cluster_table.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.cluster_table.setVerticalScrollMode(
-            QTableWidget.ScrollMode.ScrollPerPixel)
+            QTableView.ScrollMode.ScrollPerPixel)
         self.cluster_table.setHorizontalScrollMode(
-            QTableWidget.ScrollMode.ScrollPerPixel)
+            QTableView.ScrollMode.ScrollPerPixel)
+        self.cluster_table.verticalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Fixed)
         self.cluster_table.resizeColumnsToContents()
-        self.cluster_table.resizeRowsToContents()
+        # Double-click a row to drill down into its cluster's time span
+        self.cluster_table.doubleClicked.connect(self.handle_cluster_drilldown)
         self.export_clusters_button = QPushButton("Export Clusters")
         self.export_clusters_button.clicked.connect(
             self.handle_export_clusters)
@@ -80,6 +109,22 @@ class MainWindow(QMainWindow):
         # Insert below the clustering button
         cluster_layout.insertWidget(1, threshold_container)
 
+        # Semantic sub-clustering of large clusters by topic
+        semantic_container = QWidget()
+        semantic_layout = QHBoxLayout()
+        self.semantic_threshold_input = QDoubleSpinBox()
+        self.semantic_threshold_input.setRange(0.0, 1.0)
+        self.semantic_threshold_input.setSingleStep(0.05)
+        self.semantic_threshold_input.setSpecialValueText("Auto")  # 0.0 = relative depth cutoff
+        self.semantic_threshold_input.setValue(0.0)
+        self.semantic_button = QPushButton("Split Clusters by Topic")
+        self.semantic_button.clicked.connect(self.handle_semantic_clustering)
+        semantic_layout.addWidget(QLabel("Topic Similarity Threshold:"))
+        semantic_layout.addWidget(self.semantic_threshold_input)
+        semantic_layout.addWidget(self.semantic_button)
+        semantic_container.setLayout(semantic_layout)
+        cluster_layout.insertWidget(3, semantic_container)
+
         # Density Tab
         density_controls = QWidget()
         density_controls_layout = QHBoxLayout()
@@ -112,6 +157,27 @@ class MainWindow(QMainWindow):
 
         density_controls.setLayout(density_controls_layout)
 
+        # Time range zoom (minutes); also limits range exports
+        zoom_controls = QWidget()
+        zoom_layout = QHBoxLayout()
+        self.zoom_start_input = QDoubleSpinBox()
+        self.zoom_start_input.setRange(0, 100000)
+        self.zoom_start_input.setSuffix(" min")
+        self.zoom_end_input = QDoubleSpinBox()
+        self.zoom_end_input.setRange(0, 100000)
+        self.zoom_end_input.setSuffix(" min")
+        self.zoom_button = QPushButton("Zoom")
+        self.zoom_button.clicked.connect(self.handle_zoom)
+        self.reset_zoom_button = QPushButton("Reset Zoom")
+        self.reset_zoom_button.clicked.connect(self.handle_reset_zoom)
+        zoom_layout.addWidget(QLabel("From:"))
+        zoom_layout.addWidget(self.zoom_start_input)
+        zoom_layout.addWidget(QLabel("To:"))
+        zoom_layout.addWidget(self.zoom_end_input)
+        zoom_layout.addWidget(self.zoom_button)
+        zoom_layout.addWidget(self.reset_zoom_button)
+        zoom_controls.setLayout(zoom_layout)
+
         # Web view for the plot
         self.web_view = QWebEngineView()
         self.web_view.setMinimumHeight(400)
@@ -121,6 +187,7 @@ class MainWindow(QMainWindow):
         # Combine all density elements
         density_layout = QVBoxLayout()
         density_layout.addWidget(density_controls)
+        density_layout.addWidget(zoom_controls)
         density_layout.addWidget(self.web_view)
         self.density_tab.setLayout(density_layout)
 
@@ -143,6 +210,14 @@ class MainWindow(QMainWindow):
         # Set initial window size but allow resizing
         self.resize(800, 800)
         self.current_filepath = None
+        self.search_hits = None
+        self.zoom_range = None  # (start_seconds, end_seconds) or None
+        self.cluster_keywords = {}  # cluster_id -> keywords string
+
+        # Polls the tailed file for appended subtitles
+        self.tail_timer = QTimer(self)
+        self.tail_timer.setInterval(1000)
+        self.tail_timer.timeout.connect(self.handle_tail_poll)
 
     def show_error(self, message):
         error_dialog = QMessageBox(self)
@@ -162,6 +237,116 @@ class MainWindow(QMainWindow):
             if selected_files:
                 self.handle_srt_file(selected_files[0])
 
+    def handle_open_corpus(self):
+        """
+        Loads several SRT files as a corpus and charts average words per minute
+        by time-of-stream across them.
+        """
+        filepaths, _ = QFileDialog.getOpenFileNames(
+            self, "Open Corpus", "", "SRT files (*.srt)")
+        if not filepaths:
+            return
+
+        try:
+            self.status_bar.showMessage(f"Loading {len(filepaths)} transcripts...")
+            corpus = self.parse_controller.load_corpus(filepaths)
+            wpm_df = corpus.words_per_minute_by_time()
+            durations = corpus.cluster_summary()["duration"]
+        except Exception as e:
+            self.show_error(f"Failed to load corpus: {str(e)}")
+            return
+
+        # Reuse the density chart with the corpus-wide average as the bar height
+        chart_df = wpm_df.rename(columns={"avg_words_per_minute": "words_per_bin"})
+        chart_df["words_per_bin"] = chart_df["words_per_bin"].round(1)
+        self.web_view.setHtml(self.parse_controller.plot_density_chart(chart_df))
+        self.tabs.setCurrentWidget(self.density_tab)
+        self.status_bar.showMessage(
+            f"Corpus: {len(corpus.sources)} transcripts, "
+            f"{int(corpus.sources['cue_count'].sum())} subtitles, "
+            f"{len(durations)} clusters (median {durations.median():.1f}s)")
+
+    def handle_save_session(self):
+        """
+        Saves the parsed subtitles, clusters, density and control settings to a session file.
+        """
+        if self.parse_controller.current_df is None:
+            self.status_bar.showMessage(
+                "No data to save. Please load an SRT file first.")
+            return
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Session", "", "ClusterViz sessions (*.cvzs)")
+        if not path:
+            return
+        if not path.lower().endswith(".cvzs"):
+            path += ".cvzs"
+
+        settings = {
+            "source_path": self.current_filepath,
+            "search_query": self.search_input.text().strip(),
+            "zoom_range": list(self.zoom_range) if self.zoom_range else None,
+            "semantic_threshold": self.semantic_threshold_input.value(),
+        }
+        try:
+            self.parse_controller.save_session(path, settings)
+        except Exception as e:
+            self.show_error(f"Failed to save session: {str(e)}")
+            return
+        self.status_bar.showMessage(f"Session saved: {path}", 5000)
+
+    def handle_open_session(self):
+        """
+        Restores a saved session without re-parsing or re-clustering the transcript.
+        """
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Open Session", "", "ClusterViz sessions (*.cvzs)")
+        if not path:
+            return
+
+        self.stop_tail()
+        try:
+            frames, settings = self.parse_controller.load_session(path)
+        except Exception as e:
+            self.show_error(f"Failed to open session: {str(e)}")
+            return
+
+        # Restore the controls without triggering re-clustering
+        for slider, value in ((self.threshold_slider, settings["gap_threshold"]),
+                              (self.bin_slider, settings["bin_size"])):
+            slider.blockSignals(True)
+            slider.setValue(int(round(value)))
+            slider.blockSignals(False)
+        self.threshold_value_label.setText(str(self.threshold_slider.value()))
+        self.bin_size_value_label.setText(str(self.bin_slider.value()))
+        self.semantic_threshold_input.setValue(settings.get("semantic_threshold", 0))
+
+        self.current_filepath = settings.get("source_path")
+        zoom_range = settings.get("zoom_range")
+        self.zoom_range = tuple(zoom_range) if zoom_range else None
+        if self.zoom_range:
+            self.zoom_start_input.setValue(self.zoom_range[0] / 60)
+            self.zoom_end_input.setValue(self.zoom_range[1] / 60)
+        query = settings.get("search_query", "")
+        self.search_input.setText(query)
+        self.search_hits = self.parse_controller.search(query) if query else None
+
+        keywords_df = frames.get("keywords")
+        self.cluster_keywords = {} if keywords_df is None else dict(
+            zip(keywords_df["cluster_id"], keywords_df["keywords"]))
+        cues_df = frames["cues"]
+        if "cluster_id" in cues_df.columns:
+            self.populate_cluster_table(cues_df)
+        else:
+            self.populate_cluster_table(cues_df.head(5))
+
+        # The saved density covers the whole file; zoomed views are recomputed
+        density_df = frames["density"] if self.zoom_range is None \
+            else self.calculate_visible_density()
+        self.render_density_chart(density_df)
+        self.status_bar.showMessage(
+            f"Session restored: {len(cues_df)} subtitles from {path}", 5000)
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             event.acceptProposedAction()
@@ -185,27 +370,135 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage(f"File not found: {filepath}")
             return
 
+        self.stop_tail()
         self.current_filepath = filepath
         df = self.parse_controller.parse_srt_file(filepath)
-
-        # Clear previous table data
-        self.cluster_table.setRowCount(0)
+        self.search_hits = None
+        self.zoom_range = None
+        self.cluster_keywords = {}
 
         # Display first 5 rows in the table as a preview
-        for i, row in df.head(5).iterrows():
-            self.cluster_table.insertRow(i)
-            self.cluster_table.setItem(
-                i, 0, QTableWidgetItem(str(row["index"])))
-            self.cluster_table.setItem(
-                i, 1, QTableWidgetItem(f"{row['start_seconds']:.2f}"))
-            self.cluster_table.setItem(
-                i, 2, QTableWidgetItem(f"{row['end_seconds']:.2f}"))
-            self.cluster_table.setItem(i, 3, QTableWidgetItem(row["text"]))
-            # Placeholder for cluster_id
-            self.cluster_table.setItem(i, 4, QTableWidgetItem("N/A"))
-
+        self.populate_cluster_table(df.head(5))
         self.status_bar.showMessage(f"Loaded: {filepath}", 5000)
 
+    def handle_tail_toggle(self, checked):
+        """
+        Starts or stops live tail mode on an .srt file that is still being written.
+        """
+        if not checked:
+            self.stop_tail()
+            self.status_bar.showMessage("Live tail stopped", 3000)
+            return
+
+        filepath, _ = QFileDialog.getOpenFileName(
+            self, "Live Tail SRT File", "", "SRT files (*.srt)")
+        if not filepath:
+            self.tail_button.setChecked(False)
+            return
+
+        self.current_filepath = filepath
+        self.search_hits = None
+        self.zoom_range = None
+        self.cluster_keywords = {}
+        clustered_df = self.parse_controller.start_tail(filepath)
+        if clustered_df is not None:
+            self.refresh_cluster_keywords()
+            self.populate_cluster_table(clustered_df)
+        self.handle_density()
+        self.tail_timer.start()
+        self.status_bar.showMessage(f"Live tail: {filepath}", 5000)
+
+    def stop_tail(self):
+        self.tail_timer.stop()
+        self.tail_button.setChecked(False)
+        self.parse_controller.stop_tail()
+
+    def handle_tail_poll(self):
+        """
+        Pushes subtitles appended to the tailed file into the table and density chart.
+        """
+        try:
+            new_df, density_delta, full_refresh = self.parse_controller.poll_tail()
+        except Exception as e:
+            self.stop_tail()
+            self.show_error(f"Live tail stopped: {str(e)}")
+            return
+
+        if full_refresh:
+            if self.parse_controller.current_df is None:
+                self.cluster_model.clear()
+            else:
+                self.refresh_cluster_keywords()
+                self.populate_cluster_table(self.parse_controller.current_df)
+            self.handle_density()
+            return
+        if new_df.empty:
+            return
+
+        # Keywords of only the clusters the new cues extend or start
+        affected = self.parse_controller.tail_keywords(new_df)
+        self.cluster_keywords.update(zip(affected["cluster_id"], affected["keywords"]))
+
+        # Append only the new rows to the table
+        self.cluster_model.append_rows(new_df)
+        self.cluster_model.set_keywords(self.cluster_keywords)
+
+        # New cues may match the active search
+        query = self.search_input.text().strip()
+        if self.search_hits is not None and query:
+            self.search_hits = self.parse_controller.search(query)
+            self.highlight_search_hits(scroll=False)
+
+        if self.zoom_range is None:
+            self.push_density_delta(self.parse_controller.tail_density_keywords(
+                density_delta, self.cluster_keywords))
+        else:
+            self.handle_density()
+
+        self.status_bar.showMessage(
+            f"Live tail: +{len(new_df)} subtitles, "
+            f"{int(self.parse_controller.current_df['cluster_id'].iloc[-1]) + 1} clusters", 3000)
+
+    def push_density_delta(self, density_delta):
+        """
+        Updates only the changed bars of the rendered density chart via Plotly.restyle,
+        including their search-hit colour and keyword hover text.
+        """
+        hit_bins = set()
+        if self.search_hits is not None:
+            hit_bins = set(
+                (self.search_hits["start_seconds"] // self.parse_controller.bin_size).astype(int))
+        colors = ['#ffa15a' if b in hit_bins else '#636efa'
+                  for b in density_delta["bin_index"]]
+
+        xs = json.dumps(density_delta["time_minutes"].tolist())
+        ys = json.dumps(density_delta["words_per_bin"].astype(int).tolist())
+        cs = json.dumps(colors)
+        ks = json.dumps(density_delta["keywords"].tolist())
+        template = json.dumps(DENSITY_HOVER_TEMPLATE)
+        self.web_view.page().runJavaScript(f"""
+            (function() {{
+                var gd = document.getElementById('density-chart');
+                if (!gd || !gd.data) {{ return; }}
+                var trace = gd.data[0], n = trace.x.length;
+                var x = Array.from(trace.x), y = Array.from(trace.y);
+                var c = Array.isArray(trace.marker.color) ? Array.from(trace.marker.color)
+                    : new Array(n).fill('#636efa');
+                var kw = trace.customdata ? Array.from(trace.customdata) : new Array(n).fill('');
+                var dx = {xs}, dy = {ys}, dc = {cs}, dk = {ks};
+                for (var k = 0; k < dx.length; k++) {{
+                    var i = x.indexOf(dx[k]);
+                    if (i < 0) {{
+                        x.push(dx[k]); y.push(dy[k]); c.push(dc[k]); kw.push(dk[k]);
+                    }} else {{
+                        y[i] = dy[k]; c[i] = dc[k]; kw[i] = dk[k];
+                    }}
+                }}
+                Plotly.restyle(gd, {{x: [x], y: [y], text: [y], 'marker.color': [c],
+                                     customdata: [kw], hovertemplate: {template}}}, [0]);
+            }})();
+        """)
+
     def handle_clustering(self):
         """
         Handles clustering and updates the clustering tab with a table.
@@ -216,27 +509,91 @@ class MainWindow(QMainWindow):
             return
 
         clustered_df = self.parse_controller.cluster_by_time()
-
-        # Clear previous results
-        self.cluster_table.setRowCount(0)
-
-        # Populate the table
-        for i, row in clustered_df.iterrows():
-            self.cluster_table.insertRow(i)
-            self.cluster_table.setItem(
-                i, 0, QTableWidgetItem(str(row["index"])))
-            self.cluster_table.setItem(
-                i, 1, QTableWidgetItem(f"{row['start_seconds']:.2f}"))
-            self.cluster_table.setItem(
-                i, 2, QTableWidgetItem(f"{row['end_seconds']:.2f}"))
-            self.cluster_table.setItem(i, 3, QTableWidgetItem(row["text"]))
-            self.cluster_table.setItem(
-                i, 4, QTableWidgetItem(str(row["cluster_id"])))
+        self.refresh_cluster_keywords()
+        self.populate_cluster_table(clustered_df)
 
         unique_clusters = clustered_df["cluster_id"].nunique()
         self.status_bar.showMessage(
             f"Clustering completed: {unique_clusters} clusters found", 5000)
 
+    def populate_cluster_table(self, clustered_df):
+        """
+        Shows the given subtitles in the clustering table.
+        """
+        self.cluster_model.set_frame(clustered_df, self.cluster_keywords)
+        self.highlight_search_hits()
+
+    def refresh_cluster_keywords(self):
+        """
+        Recomputes the top keywords of the current clusters for the table and chart.
+        """
+        keywords_df = self.parse_controller.cluster_keywords()
+        self.cluster_keywords = dict(
+            zip(keywords_df["cluster_id"], keywords_df["keywords"]))
+
+    def handle_semantic_clustering(self):
+        """
+        Splits the current time-based clusters by topic and shows the sub-cluster IDs.
+        """
+        if self.parse_controller.current_df is None or \
+                "cluster_id" not in self.parse_controller.current_df.columns:
+            self.status_bar.showMessage(
+                "No clusters to split. Please run time-based clustering first.")
+            return
+
+        threshold = self.semantic_threshold_input.value() or None
+        try:
+            self.status_bar.showMessage("Splitting clusters by topic...")
+            df = self.parse_controller.semantic_sub_cluster(
+                similarity_threshold=threshold)
+        except Exception as e:
+            self.show_error(f"Semantic sub-clustering failed: {str(e)}")
+            return
+
+        self.populate_cluster_table(df)
+        topics = df.groupby(["cluster_id", "sub_cluster_id"]).ngroups
+        self.status_bar.showMessage(
+            f"Split {df['cluster_id'].nunique()} clusters into {topics} topic segments", 5000)
+
+    def handle_search(self):
+        """
+        Runs the search box query and highlights hits in the table and density chart.
+        """
+        if self.parse_controller.current_df is None:
+            self.status_bar.showMessage(
+                "No data to search. Please load an SRT file first.")
+            return
+
+        query = self.search_input.text().strip()
+        if not query:
+            self.search_hits = None
+            self.highlight_search_hits()
+            self.status_bar.showMessage("Search cleared", 3000)
+        else:
+            self.search_hits = self.parse_controller.search(query)
+            self.highlight_search_hits()
+            message = f"Search: {len(self.search_hits)} matching subtitles"
+            if "cluster_id" in self.search_hits.columns:
+                message += f" in {self.search_hits['cluster_id'].nunique()} clusters"
+            self.status_bar.showMessage(message, 5000)
+
+        if self.tabs.currentWidget() == self.density_tab:
+            self.handle_density()
+
+    def highlight_search_hits(self, scroll=True):
+        """
+        Colors table rows whose subtitle index is in the current search hits.
+        :param scroll: Scroll to the first hit
+        """
+        hit_indices = set()
+        if self.search_hits is not None:
+            hit_indices = set(self.search_hits["index"].tolist())
+        self.cluster_model.set_search_hits(hit_indices)
+
+        first_hit = self.cluster_model.first_hit_row() if scroll else None
+        if first_hit is not None:
+            self.cluster_table.scrollTo(self.cluster_model.index(first_hit, 0))
+
     def handle_density(self):
         """
         Handles density chart plotting and updates the density tab.
@@ -250,14 +607,8 @@ class MainWindow(QMainWindow):
             # Clear existing web view content
             self.web_view.setHtml("")
 
-            # Calculate density
-            density_df = self.parse_controller.calculate_density()
-
-            # Generate new chart
-            chart_html = self.parse_controller.plot_density_chart(density_df)
-
-            # Update web view
-            self.web_view.setHtml(chart_html)
+            # Calculate density (limited to the zoom range, if any)
+            self.render_density_chart(self.calculate_visible_density())
             self.status_bar.showMessage("Density chart updated", 5000)
 
         except Exception as e:
@@ -265,6 +616,85 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage(
                 f"Error creating density chart: {str(e)}")
 
+    def render_density_chart(self, density_df):
+        """
+        Draws a density DataFrame with cluster keywords and search hit highlights.
+        """
+        if self.cluster_keywords:
+            keywords_df = pd.DataFrame({
+                "cluster_id": list(self.cluster_keywords),
+                "keywords": list(self.cluster_keywords.values())})
+            density_df = self.parse_controller.add_density_keywords(
+                density_df, keywords_df)
+
+        # Bins containing search hits, if any
+        highlight_bins = None
+        if self.search_hits is not None:
+            highlight_bins = set(
+                (self.search_hits["start_seconds"] // self.parse_controller.bin_size).astype(int))
+
+        # Generate new chart
+        chart_html = self.parse_controller.plot_density_chart(
+            density_df, highlight_bins=highlight_bins)
+
+        # Update web view
+        self.web_view.setHtml(chart_html)
+
+    def calculate_visible_density(self):
+        """
+        Computes density over the zoomed time range, or the whole file if not zoomed.
+        """
+        if self.zoom_range is None:
+            return self.parse_controller.calculate_density()
+        range_df = self.parse_controller.query_time_range(*self.zoom_range)
+        return self.parse_controller.calculate_density(range_df.copy())
+
+    def handle_zoom(self):
+        """
+        Zooms the density chart (and range exports) to the selected time window.
+        """
+        if self.parse_controller.current_df is None:
+            self.status_bar.showMessage(
+                "No data to zoom. Please load an SRT file first.")
+            return
+
+        start = self.zoom_start_input.value() * 60
+        end = self.zoom_end_input.value() * 60
+        if end <= start:
+            self.status_bar.showMessage("Zoom end must be after zoom start.")
+            return
+        if self.parse_controller.query_time_range(start, end).empty:
+            self.status_bar.showMessage("No subtitles in the selected range.")
+            return
+
+        self.zoom_range = (start, end)
+        self.handle_density()
+        self.status_bar.showMessage(
+            f"Zoomed to {start / 60:.2f}-{end / 60:.2f} minutes", 3000)
+
+    def handle_reset_zoom(self):
+        """
+        Clears the time range zoom and redraws the full density chart.
+        """
+        self.zoom_range = None
+        if self.parse_controller.current_df is not None:
+            self.handle_density()
+
+    def handle_cluster_drilldown(self, index):
+        """
+        Shows only the subtitles overlapping the time span of the double-clicked cluster.
+        """
+        cluster_id = self.cluster_model.cluster_id_at(index.row())
+        if cluster_id is None:
+            return
+
+        cluster_id = int(cluster_id)
+        drilldown_df = self.parse_controller.cluster_drilldown(cluster_id)
+        self.populate_cluster_table(drilldown_df.reset_index(drop=True))
+        self.status_bar.showMessage(
+            f"Cluster {cluster_id}: {len(drilldown_df)} overlapping subtitles "
+            "(re-run clustering to show all)", 5000)
+
     def handle_bin_size_change(self, value):
         """
         Updates the bin size in the controller and refreshes the density plot
@@ -287,21 +717,10 @@ class MainWindow(QMainWindow):
         # Re-run clustering if data is loaded
         if self.parse_controller.current_df is not None:
             clustered_df = self.parse_controller.cluster_by_time()
-            self.parse_controller.current_df = clustered_df  # Ensure `current_df` is updated
+            self.refresh_cluster_keywords()
 
             # Clear and repopulate the table with updated clustering
-            self.cluster_table.setRowCount(0)
-            for i, row in clustered_df.iterrows():
-                self.cluster_table.insertRow(i)
-                self.cluster_table.setItem(
-                    i, 0, QTableWidgetItem(str(row["index"])))
-                self.cluster_table.setItem(
-                    i, 1, QTableWidgetItem(f"{row['start_seconds']:.2f}"))
-                self.cluster_table.setItem(
-                    i, 2, QTableWidgetItem(f"{row['end_seconds']:.2f}"))
-                self.cluster_table.setItem(i, 3, QTableWidgetItem(row["text"]))
-                self.cluster_table.setItem(
-                    i, 4, QTableWidgetItem(str(row["cluster_id"])))
+            self.populate_cluster_table(clustered_df)
 
             unique_clusters = clustered_df["cluster_id"].nunique()
             self.status_bar.showMessage(
@@ -335,9 +754,11 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Unsupported file format.")
             return
 
-        # Prepare data and metadata
-        df = self.parse_controller.current_df[[
-            "index", "start_seconds", "end_seconds", "text", "cluster_id"]]
+        # Prepare data and metadata (limited to the zoom range, if any)
+        df = self.parse_controller.current_df
+        if self.zoom_range is not None:
+            df = self.parse_controller.query_time_range(*self.zoom_range)
+        df = df[["index", "start_seconds", "end_seconds", "text", "cluster_id"]]
         gap_threshold = self.parse_controller.gap_threshold
         num_clusters = df["cluster_id"].nunique()
 
@@ -376,6 +797,9 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'chart_export_thread'):
             self.chart_export_thread.cleanup()
             self.chart_export_thread.deleteLater()
+        self.stop_tail()
+        if self.parse_controller.corpus is not None:
+            self.parse_controller.corpus.close()
         event.accept()
 
     def handle_export_chart(self):
@@ -421,7 +845,7 @@ class MainWindow(QMainWindow):
             os.makedirs(os.path.dirname(file_path) if os.path.dirname(
                 file_path) else '.', exist_ok=True)
 
-            density_df = self.parse_controller.calculate_density()
+            density_df = self.calculate_visible_density()
 
             # Create new thread with 30 second timeout
             self.chart_export_thread = ChartExportWorker(